@@ -8,8 +8,12 @@ from datetime import datetime, timedelta
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lib/python'))
 
 from api.sam_client import SAMClient
+from http_response import parse_fields, send_json, stream_ndjson, wants_ndjson
 
 class handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 is required for chunked NDJSON streaming
+    protocol_version = 'HTTP/1.1'
+
     def do_POST(self):
         """
         Fetch opportunities from SAM.gov API
@@ -20,7 +24,11 @@ class handler(BaseHTTPRequestHandler):
             "posted_days_ago": 60,
             "min_deadline_days": 14,
             "naics_code": "334519" (optional),
-            "status": "active" (optional)
+            "status": "active" (optional),
+            "include_raw": false (optional, attach the full SAM payload as "raw"),
+            "shape": "record" (optional, "sam" returns SAM.gov's original objects),
+            "fields": ["title", "naics_code"] (optional, list or comma-separated),
+            "stream": false (optional, same as Accept: application/x-ndjson)
         }
 
         Response:
@@ -30,6 +38,18 @@ class handler(BaseHTTPRequestHandler):
             "opportunities": [...],
             "timestamp": "2024-01-02T..."
         }
+
+        Breaking change: by default each opportunity is an OpportunityRecord dict
+        with snake_case keys (solicitation_number, naics_code, response_deadline,
+        ...) and only the fields listed in opportunity_record.FIELD_ALIASES;
+        every other SAM.gov field is dropped. Pass "shape": "sam" to get the
+        previous response shape (SAM.gov's camelCase objects, all fields).
+
+        In streaming mode the response is chunked NDJSON: one opportunity per
+        line, followed by a final line holding the remaining response fields
+        (or a {"status": "error"} line if serialization fails mid-stream).
+        Records are only streamed once the SAM.gov search has returned. Both
+        modes are gzip/zstd compressed according to Accept-Encoding.
         """
         try:
             # Parse request body
@@ -46,6 +66,13 @@ class handler(BaseHTTPRequestHandler):
             min_deadline_days = params.get('min_deadline_days', 14)
             naics_code = params.get('naics_code')
             status = params.get('status', 'active')
+            include_raw = bool(params.get('include_raw', False))
+            sam_shape = params.get('shape') == 'sam'
+            fields = parse_fields(params.get('fields'))
+            stream = wants_ndjson(self.headers, params)
+            if fields and 'raw' not in fields:
+                include_raw = False
+            keep_raw = include_raw or sam_shape
 
             # Calculate date range
             today = datetime.now()
@@ -66,29 +93,26 @@ class handler(BaseHTTPRequestHandler):
             if naics_code:
                 search_params['ncode'] = naics_code
 
-            # Fetch opportunities
-            opportunities = sam_client.search_opportunities(search_params)
+            # Fetch opportunities as compact records (aliases and dates resolved once)
+            opportunities = sam_client.search_opportunity_records(search_params, keep_raw=keep_raw)
+            if opportunities is None:
+                raise RuntimeError('SAM.gov search failed')
 
             # Filter by deadline (only keep opps with deadline >= min_deadline_days)
-            filtered_opportunities = []
-            for opp in opportunities:
-                deadline_str = opp.get('responseDeadLine')
-
-                if not deadline_str:
-                    # No deadline, include it
-                    filtered_opportunities.append(opp)
-                    continue
-
-                try:
-                    # Parse deadline
-                    deadline_date = datetime.strptime(deadline_str, '%Y-%m-%dT%H:%M:%SZ')
-
-                    # Check if deadline is far enough away
-                    if deadline_date >= min_deadline_date:
-                        filtered_opportunities.append(opp)
-                except ValueError:
-                    # Can't parse date, include it anyway
-                    filtered_opportunities.append(opp)
+            filtered_opportunities = [
+                opp for opp in opportunities
+                # No deadline (or unparseable), include it
+                if opp.response_deadline is None or opp.response_deadline >= min_deadline_date
+            ]
+
+            def serialize(opp):
+                if sam_shape:
+                    raw = opp.raw
+                    return {key: raw[key] for key in fields if key in raw} if fields else raw
+                item = opp.to_dict(fields)
+                if include_raw:
+                    item['raw'] = opp.raw
+                return item
 
             # Return response
             response_data = {
@@ -96,7 +120,6 @@ class handler(BaseHTTPRequestHandler):
                 "count": len(filtered_opportunities),
                 "total_fetched": len(opportunities),
                 "filtered_count": len(opportunities) - len(filtered_opportunities),
-                "opportunities": filtered_opportunities,
                 "timestamp": datetime.now().isoformat(),
                 "search_params": {
                     "posted_from": start_date.strftime('%Y-%m-%d'),
@@ -106,11 +129,12 @@ class handler(BaseHTTPRequestHandler):
                 }
             }
 
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode())
+            if stream:
+                # Handles its own errors once the 200 is sent; never falls through to the 500 below
+                stream_ndjson(self, (serialize(opp) for opp in filtered_opportunities), trailer=response_data)
+            else:
+                response_data["opportunities"] = [serialize(opp) for opp in filtered_opportunities]
+                send_json(self, 200, response_data)
 
         except Exception as e:
             # Error response
@@ -120,11 +144,7 @@ class handler(BaseHTTPRequestHandler):
                 "timestamp": datetime.now().isoformat()
             }
 
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(error_response).encode())
+            send_json(self, 500, error_response)
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
@@ -132,4 +152,5 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
         self.end_headers()
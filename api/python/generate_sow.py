@@ -8,6 +8,7 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lib/python'))
 
 from sow_generator_pdf import SOWGeneratorPDF
+from http_response import send_json
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
@@ -48,11 +49,6 @@ class handler(BaseHTTPRequestHandler):
                 os.remove(pdf_path)
 
             # Send success response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-
             response = {
                 'status': 'success',
                 'pdf_base64': pdf_base64,
@@ -60,22 +56,17 @@ class handler(BaseHTTPRequestHandler):
                 'sow_id': sow_id
             }
 
-            self.wfile.write(json.dumps(response).encode())
+            send_json(self, 200, response)
 
         except Exception as e:
             # Send error response
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-
             error_response = {
                 'status': 'error',
                 'error': str(e),
                 'type': type(e).__name__
             }
 
-            self.wfile.write(json.dumps(error_response).encode())
+            send_json(self, 500, error_response)
 
     def do_OPTIONS(self):
         """Handle OPTIONS request for CORS"""
@@ -0,0 +1,136 @@
+from http.server import BaseHTTPRequestHandler
+import json
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+
+# Add lib to path for importing shared modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lib/python'))
+
+from job_runner import JobStore
+from opportunity_sync import OpportunitySyncJob, sync_window
+from http_response import send_json
+from opportunity_sink import OpportunitySink
+
+# Stop leasing new work units this long into the invocation; vercel.json caps
+# api/python functions at 60s, so leave headroom to respond.
+DEFAULT_TIME_BUDGET = 45
+
+SAM_MAX_PAGE_SIZE = 1000
+
+
+class handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        """
+        Run (or resume) a checkpointed SAM.gov sync into the Opportunity table
+
+        Request body (JSON):
+        {
+            "posted_days_ago": 1,
+            "window_days": 1,
+            "naics_code": "334519" (optional),
+            "workers": 2 (optional),
+            "time_budget": 45 (optional, seconds),
+            "page_size": 1000 (optional, SAM.gov page size, max 1000),
+            "dry_run": false (optional, merge then roll back),
+            "retry_failed": false (optional, retry windows that ran out of attempts)
+        }
+
+        Response:
+        {
+            "status": "success",
+            "complete": false,
+            "progress": {"pending": 3, "backing_off": 1, "done": 4, "failed": 0, ...},
+            "retried": 0,
+            "written": {"inserted": 120, "updated": 30, ...},
+            "timestamp": "2024-01-02T..."
+        }
+
+        Each page is upserted before its offset is checkpointed, so a run killed
+        mid-way loses nothing. Call repeatedly until "complete" is true; each
+        call resumes where the previous one stopped. A window whose SAM.gov
+        requests fail (e.g. 429s) is retried by later calls with backoff; after
+        3 attempts it is counted as "failed" and "complete" stays false until a
+        call passes "retry_failed": true. Use fetch_opportunities to get records
+        back in the response instead.
+        """
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            if content_length > 0:
+                body = self.rfile.read(content_length)
+                params = json.loads(body.decode('utf-8'))
+            else:
+                params = {}
+
+            posted_days_ago = params.get('posted_days_ago', 1)
+            window_days = params.get('window_days', 1)
+            naics_code = params.get('naics_code')
+            workers = params.get('workers', 2)
+            dry_run = bool(params.get('dry_run', False))
+            retry_failed = bool(params.get('retry_failed', False))
+            time_budget = min(params.get('time_budget', DEFAULT_TIME_BUDGET), DEFAULT_TIME_BUDGET)
+            page_size = max(1, min(int(params.get('page_size', SAM_MAX_PAGE_SIZE)), SAM_MAX_PAGE_SIZE))
+
+            written = {'received': 0, 'skipped': 0, 'inserted': 0, 'updated': 0, 'batches': 0}
+            written_lock = threading.Lock()
+            sink = OpportunitySink(dry_run=dry_run)
+
+            def write_records(records):
+                counts = sink.write(records)
+                with written_lock:
+                    for key in written:
+                        written[key] += counts[key]
+
+            # A dry run persists nothing, so it must not advance the real job's checkpoints
+            scratch_dir = tempfile.mkdtemp(prefix='usher_sync_dry_run_') if dry_run else None
+            store = JobStore(os.path.join(scratch_dir, 'jobs.sqlite')) if dry_run else None
+
+            job = OpportunitySyncJob(
+                on_records=write_records,
+                store=store,
+                job_name=f"opportunity-sync-{datetime.now().strftime('%Y-%m-%d')}",
+                page_size=page_size,
+                naics_code=naics_code,
+                keep_raw=True,  # the sink stores the full SAM payload as rawData
+            )
+            try:
+                posted_from, posted_to = sync_window(posted_days_ago)
+                job.plan(posted_from, posted_to, window_days=window_days)
+                retried = job.retry_failed() if retry_failed else 0
+                stats = job.run(time_budget=time_budget, workers=workers)
+            finally:
+                sink.close()
+                if scratch_dir:
+                    shutil.rmtree(scratch_dir, ignore_errors=True)
+
+            response_data = {
+                "status": "success",
+                "complete": stats['complete'],
+                "progress": stats,
+                "retried": retried,
+                "written": written,
+                "dry_run": dry_run,
+                "timestamp": datetime.now().isoformat()
+            }
+
+            send_json(self, 200, response_data)
+
+        except Exception as e:
+            error_response = {
+                "status": "error",
+                "error": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+
+            send_json(self, 500, error_response)
+
+    def do_OPTIONS(self):
+        """Handle CORS preflight"""
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
@@ -7,6 +7,8 @@ from datetime import datetime
 # Add lib to path for importing shared modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../lib/python'))
 
+from http_response import send_json
+
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         """Handle GET requests - simple health check"""
@@ -18,11 +20,7 @@ class handler(BaseHTTPRequestHandler):
             "path_info": sys.path[:3]
         }
 
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(response_data, indent=2).encode())
+        send_json(self, 200, response_data)
 
     def do_POST(self):
         """Handle POST requests - echo back the data"""
@@ -45,8 +43,4 @@ class handler(BaseHTTPRequestHandler):
             "echo": f"You sent: {request_data.get('message', 'No message')}"
         }
 
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(response_data, indent=2).encode())
+        send_json(self, 200, response_data)
@@ -0,0 +1,301 @@
+import base64
+import binascii
+import hashlib
+import html
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from opportunity_record import OpportunityRecord
+
+load_dotenv()
+
+DEFAULT_STORE_DIR = os.getenv('DOCUMENT_STORE_DIR', '/tmp/usher_documents')
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    url           TEXT PRIMARY KEY,
+    notice_id     TEXT,
+    kind          TEXT NOT NULL,
+    sha256        TEXT,
+    content_type  TEXT,
+    size          INTEGER,
+    etag          TEXT,
+    last_modified TEXT,
+    fetched_at    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_notice ON documents (notice_id);
+"""
+
+_TEXT_TYPES = ('text/', 'application/json', 'application/xml', 'application/xhtml')
+
+# Leading bytes of the binary formats SAM.gov attachments come in (PDF, DOCX/XLSX, DOC/XLS, images)
+_BINARY_MAGIC = (b'%PDF', b'PK\x03\x04', b'\xd0\xcf\x11\xe0', b'\x89PNG', b'\xff\xd8\xff', b'GIF8')
+_SNIFF_BYTES = 4096
+
+
+def looks_like_text(prefix: bytes) -> bool:
+    """Guess whether an untyped document is text from its first bytes"""
+    if prefix.startswith(_BINARY_MAGIC) or b'\x00' in prefix:
+        return False
+    try:
+        prefix.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the sample is still text
+        return e.start >= len(prefix) - 3 and e.reason == 'unexpected end of data'
+    return True
+
+
+def html_to_text(markup: str) -> str:
+    """Flatten SAM.gov description HTML to plain text (mirrors scripts/backfill-descriptions.ts)"""
+    text = re.sub(r'<br\s*/?>', '\n', markup, flags=re.I)
+    text = re.sub(r'</p>', '\n\n', text, flags=re.I)
+    text = re.sub(r'</li>', '\n', text, flags=re.I)
+    text = re.sub(r'<li[^>]*>', '- ', text, flags=re.I)
+    text = re.sub(r'</?(h[1-6]|div|section|article|header|footer|nav)[^>]*>', '\n\n', text, flags=re.I)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = html.unescape(text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+class DocumentFetcher:
+    """
+    Downloads opportunity descriptions and attachments into a content-addressed store.
+
+    Bodies are streamed to disk while being hashed, so no file is held in memory.
+    Identical documents (e.g. the same attachment re-posted on an amendment) are
+    stored once under their SHA-256. A per-URL manifest keeps ETag/Last-Modified,
+    so re-runs send conditional requests and only transfer documents that changed.
+
+    A URL seen for the first time (e.g. an amendment re-posting a file under a
+    new resource link) can't be sent conditionally, so it is downloaded and
+    deduplicated on the streamed SHA-256. The download is only skipped when
+    the response carries a SHA-256 content digest (x-amz-checksum-sha256,
+    Repr-Digest or Digest) of an object already in the store. ETags are never
+    compared across URLs: they only identify versions of one resource.
+    """
+
+    def __init__(self, store_dir: str = None, api_key: str = None, max_workers: int = 8,
+                 chunk_size: int = 64 * 1024, timeout: int = 60):
+        self.store_dir = store_dir or DEFAULT_STORE_DIR
+        self.api_key = api_key or os.getenv('SAM_API_KEY')
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+
+        os.makedirs(os.path.join(self.store_dir, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(self.store_dir, 'text'), exist_ok=True)
+        os.makedirs(os.path.join(self.store_dir, 'tmp'), exist_ok=True)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._manifest = sqlite3.connect(os.path.join(self.store_dir, 'manifest.sqlite'),
+                                         check_same_thread=False, isolation_level=None)
+        self._manifest.executescript(MANIFEST_SCHEMA)
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.store_dir, 'objects', sha256[:2], sha256)
+
+    def fetch_opportunities(self, opportunities: Iterable) -> Dict[str, List[Dict]]:
+        """Fetch every description and attachment for ``opportunities``, keyed by notice id"""
+        jobs = []
+        for opportunity in opportunities:
+            record = OpportunityRecord.coerce(opportunity)
+            notice_id = record.notice_id or record.solicitation_number
+            if record.description_url and record.description_url.startswith('http'):
+                jobs.append((record.description_url, notice_id, 'description'))
+            for link in record.resource_links or []:
+                jobs.append((link, notice_id, 'attachment'))
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for result in pool.map(lambda job: self.fetch(*job), jobs):
+                results.setdefault(result['notice_id'], []).append(result)
+        return results
+
+    def fetch_opportunity(self, opportunity) -> List[Dict]:
+        results = self.fetch_opportunities([opportunity])
+        return next(iter(results.values()), [])
+
+    def fetch(self, url: str, notice_id: str = None, kind: str = 'attachment') -> Dict:
+        """
+        Fetch one document. Returns a dict with ``status`` of 'downloaded',
+        'unchanged' (304 from a conditional request), 'duplicate' (the response's
+        SHA-256 digest header names an object already stored; body not read)
+        or 'error'.
+        """
+        known = self._manifest_row(url)
+        headers = {}
+        if known and known['sha256'] and os.path.exists(self.object_path(known['sha256'])):
+            if known['etag']:
+                headers['If-None-Match'] = known['etag']
+            if known['last_modified']:
+                headers['If-Modified-Since'] = known['last_modified']
+
+        result = {'url': url, 'notice_id': notice_id, 'kind': kind}
+        try:
+            with self.session.get(self._authorized(url), headers=headers, stream=True,
+                                  timeout=self.timeout) as response:
+                if response.status_code == 304:
+                    result.update(status='unchanged', changed=False, sha256=known['sha256'],
+                                  size=known['size'], content_type=known['content_type'])
+                    return result
+                if response.status_code != 200:
+                    result.update(status='error', error=f"HTTP {response.status_code}")
+                    return result
+
+                content_type = (response.headers.get('Content-Type') or '').split(';')[0].strip()
+                sha256 = self._stored_digest(response.headers)
+                if sha256:
+                    status, size = 'duplicate', os.path.getsize(self.object_path(sha256))
+                else:
+                    status = 'downloaded'
+                    sha256, size = self._store_stream(response)
+                self._record(url, notice_id, kind, sha256, content_type, size,
+                             response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        except Exception as e:
+            print(f"Error fetching document {url}: {e}")
+            result.update(status='error', error=str(e))
+            return result
+
+        changed = not known or known['sha256'] != sha256
+        result.update(status=status, changed=changed, sha256=sha256, size=size,
+                      content_type=content_type)
+        return result
+
+    def extract_text(self, sha256: str, content_type: str = None) -> Optional[str]:
+        """
+        Plain text for a stored document, cached per content hash. Documents
+        served without a Content-Type are sniffed; binary ones return None.
+        """
+        cache_path = os.path.join(self.store_dir, 'text', f"{sha256}.txt")
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return f.read()
+
+        if content_type and not content_type.startswith(_TEXT_TYPES):
+            return None
+        object_path = self.object_path(sha256)
+        if not os.path.exists(object_path):
+            return None
+        with open(object_path, 'rb') as f:
+            if not content_type and not looks_like_text(f.read(_SNIFF_BYTES)):
+                return None
+            f.seek(0)
+            body = f.read().decode('utf-8', errors='replace')
+
+        if content_type == 'application/json':
+            try:
+                body = json.loads(body).get('description') or ''
+            except (ValueError, AttributeError):
+                pass
+        text = html_to_text(body)
+
+        self._write_atomic(cache_path, text.encode('utf-8'))
+        return text
+
+    def _authorized(self, url: str) -> str:
+        """SAM.gov description/resource URLs need the api_key query parameter"""
+        parsed = urlparse(url)
+        host = (parsed.hostname or '').lower()
+        if not self.api_key or not (host == 'sam.gov' or host.endswith('.sam.gov')):
+            return url
+        query = dict(parse_qsl(parsed.query))
+        if 'api_key' in query:
+            return url
+        query['api_key'] = self.api_key
+        return urlunparse(parsed._replace(query=urlencode(query)))
+
+    def _store_stream(self, response):
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.store_dir, 'tmp'))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if chunk:
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+            sha256 = digest.hexdigest()
+            target = self.object_path(sha256)
+            if os.path.exists(target):
+                # Same bytes already stored (e.g. re-posted on an amendment)
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return sha256, size
+
+    def _write_atomic(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.store_dir, 'tmp'))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _manifest_row(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            cursor = self._manifest.execute(
+                "SELECT sha256, content_type, size, etag, last_modified FROM documents WHERE url = ?",
+                (url,)
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip(('sha256', 'content_type', 'size', 'etag', 'last_modified'), row))
+
+    def _stored_digest(self, headers) -> Optional[str]:
+        """SHA-256 from a content digest header, if that object is already stored"""
+        if (headers.get('Content-Encoding') or 'identity').lower() != 'identity':
+            return None  # digest covers the encoded bytes, the store holds decoded ones
+        candidates = [headers.get('x-amz-checksum-sha256')]
+        for header in ('Repr-Digest', 'Digest'):
+            for part in (headers.get(header) or '').split(','):
+                algorithm, _, value = part.strip().partition('=')
+                if algorithm.lower() == 'sha-256':
+                    candidates.append(value.strip(':'))
+        for value in candidates:
+            if not value:
+                continue
+            try:
+                digest = base64.b64decode(value, validate=True)
+            except (binascii.Error, ValueError):
+                continue
+            if len(digest) == 32 and os.path.exists(self.object_path(digest.hex())):
+                return digest.hex()
+        return None
+
+    def _record(self, url, notice_id, kind, sha256, content_type, size, etag, last_modified):
+        with self._lock:
+            self._manifest.execute(
+                """
+                INSERT INTO documents (url, notice_id, kind, sha256, content_type, size, etag, last_modified, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    notice_id = excluded.notice_id, kind = excluded.kind, sha256 = excluded.sha256,
+                    content_type = excluded.content_type, size = excluded.size, etag = excluded.etag,
+                    last_modified = excluded.last_modified, fetched_at = excluded.fetched_at
+                """,
+                (url, notice_id, kind, sha256, content_type, size, etag, last_modified,
+                 datetime.now().isoformat())
+            )
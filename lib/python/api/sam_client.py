@@ -3,12 +3,14 @@ import os
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from opportunity_record import OpportunityRecord, decode_search_page
+
 load_dotenv()
 
 class SAMClient:
     def __init__(self, api_key: str = None):
         self.api_key = api_key or os.getenv('SAM_API_KEY')
-        self.base_url = "https://api.sam.gov/opportunities/v2"
+        self.base_url = os.getenv('SAM_API_BASE_URL', "https://api.sam.gov/opportunities/v2")
     
     def search_opportunities(self, params: Dict) -> Optional[Dict]:
         try:
@@ -21,7 +23,27 @@ class SAMClient:
         except Exception as e:
             print(f"SAM API error: {e}")
             return None
-            
+
+    def search_opportunity_records(self, params: Dict, keep_raw: bool = False) -> Optional[List[OpportunityRecord]]:
+        """Search opportunities and decode them straight into compact OpportunityRecords"""
+        page = self.search_opportunity_page(params, keep_raw=keep_raw)
+        return page['records'] if page is not None else None
+
+    def search_opportunity_page(self, params: Dict, keep_raw: bool = False, timeout: float = 60) -> Optional[Dict]:
+        """One search page as {'records', 'total_records', 'page_count'} (see decode_search_page)"""
+        try:
+            response = requests.get(
+                f"{self.base_url}/search",
+                params={'api_key': self.api_key, **params},
+                timeout=timeout
+            )
+            if response.status_code != 200:
+                return None
+            return decode_search_page(response.content, keep_raw=keep_raw)
+        except Exception as e:
+            print(f"SAM API error: {e}")
+            return None
+
     def search_businesses_by_naics(self, naics_code: str, state: str = None, limit: int = 50) -> List[Dict]:
         """Search businesses by NAICS code and optional state filter"""
         try:
@@ -64,7 +86,7 @@ class SAMClient:
         try:
             # SAM opportunities endpoint
             response = requests.get(
-                f"https://api.sam.gov/opportunities/v2/search",
+                f"{self.base_url}/search",
                 params={
                     'api_key': self.api_key,
                     'solNumber': solicitation_number
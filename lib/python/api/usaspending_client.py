@@ -1,10 +1,11 @@
+import os
 import requests
 import pandas as pd
 from typing import Dict, List, Optional
 
 class USASpendingClient:
     def __init__(self):
-        self.base_url = "https://api.usaspending.gov"
+        self.base_url = os.getenv('USASPENDING_BASE_URL', "https://api.usaspending.gov")
     
     def get_historical_awards(self, naics_code: str, agency: str = None, 
                             state: str = None, years_back: int = 3) -> Optional[Dict]:
@@ -0,0 +1,256 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+SAM_SEARCH_FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'loadtest', 'fixtures',
+                                  'sam_opportunities_search.json')
+SAM_SEARCH_COPIES = 400  # 25 fixture opportunities -> a 10,000-item search page
+DEFAULT_THRESHOLD = 0.20
+AWARD_SIZES = (50, 1000, 100_000, 1_000_000)
+
+SAMPLE_RFP = {
+    'title': 'Facilities Support Services',
+    'solicitation_number': 'W912DY-26-R-0001',
+    'naics_code': '561210',
+    'agency': 'Department of the Army',
+}
+
+RECIPIENTS = [f"Contractor {i} LLC" for i in range(500)]
+
+
+def synthetic_awards(rows: int, seed: int = 0) -> Dict:
+    """USASpending spending_by_award-shaped payload with ``rows`` results"""
+    rng = random.Random(seed)
+    return {'results': [
+        {
+            'Award ID': f"W91ZRS{i:08d}",
+            'Recipient Name': rng.choice(RECIPIENTS),
+            'Award Amount': round(rng.lognormvariate(12, 1), 2),
+            'Start Date': '2023-03-01',
+            'End Date': '2024-02-28',
+            'Awarding Agency': 'Department of Defense',
+        }
+        for i in range(rows)
+    ]}
+
+
+def sam_search_body(copies: int = SAM_SEARCH_COPIES) -> str:
+    """The recorded SAM.gov search page with its opportunities repeated ``copies`` times"""
+    with open(SAM_SEARCH_FIXTURE, 'r', encoding='utf-8') as f:
+        body = json.load(f)['body']
+    items = body['opportunitiesData'] * copies
+    return json.dumps({**body, 'totalRecords': len(items), 'opportunitiesData': items})
+
+
+# Each benchmark is (name, setup, repeat). setup() runs untimed and returns the
+# zero-argument callable that is timed.
+def _pricing_with_quotes():
+    from pricing_engine import PricingEngine
+    engine = PricingEngine()
+    quotes = [48250.0, 61500.0, 55300.0, 72000.0, 51800.0]
+    return lambda: engine.calculate_optimal_price(quotes, '561210')
+
+
+def _pricing_industry_average():
+    from pricing_engine import PricingEngine
+    engine = PricingEngine()
+    return lambda: engine.calculate_optimal_price([], '541330')
+
+
+def _analyze_profitability():
+    from bid_analyzer import BidAnalyzer
+    from pricing_engine import PricingEngine
+    analyzer = BidAnalyzer()
+    pricing = PricingEngine().calculate_optimal_price([48250.0, 61500.0, 55300.0], '561210')
+    opportunity = {'noticeId': 'bench', 'naicsCode': '561210', 'title': SAMPLE_RFP['title']}
+    return lambda: analyzer.analyze_profitability(opportunity, pricing)
+
+
+def _award_analysis(rows: int):
+    def setup():
+        from api.usaspending_client import USASpendingClient
+        client = USASpendingClient()
+        data = synthetic_awards(rows)
+        return lambda: client._analyze_award_data(data, '561210')
+    return setup
+
+
+def _sam_search_json_loads():
+    # Reference point for decode_search_page: the plain dicts it replaces
+    body = sam_search_body()
+    return lambda: json.loads(body)['opportunitiesData']
+
+
+def _sam_search_records():
+    from opportunity_record import decode_search_page
+    body = sam_search_body()
+    return lambda: decode_search_page(body)['records']
+
+
+def _generate_pdf_sow():
+    from sow_generator_pdf import SOWGeneratorPDF
+    generator = SOWGeneratorPDF()
+    subcontractor = {'name': 'Benchmark Subcontractor'}
+
+    def run():
+        os.remove(generator.generate_pdf_sow(SAMPLE_RFP, subcontractor, 'BENCH'))
+    return run
+
+
+BENCHMARKS: List[Tuple[str, Callable, int]] = [
+    ('pricing.calculate_optimal_price[quotes]', _pricing_with_quotes, 7),
+    ('pricing.calculate_optimal_price[industry_average]', _pricing_industry_average, 7),
+    ('bid_analyzer.analyze_profitability', _analyze_profitability, 7),
+    *[(f"usaspending._analyze_award_data[{rows}]", _award_analysis(rows), 5 if rows < 1_000_000 else 3)
+      for rows in AWARD_SIZES],
+    (f"sam_search.json_loads[{25 * SAM_SEARCH_COPIES}]", _sam_search_json_loads, 5),
+    (f"sam_search.decode_search_page[{25 * SAM_SEARCH_COPIES}]", _sam_search_records, 5),
+    ('sow_generator_pdf.generate_pdf_sow', _generate_pdf_sow, 5),
+]
+
+
+def machine_id() -> str:
+    """Baselines are only comparable on the same host / CPU / Python"""
+    raw = f"{platform.node()}-{platform.machine()}-py{platform.python_version()}"
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', raw)
+
+
+def measure(func: Callable, repeat: int) -> Dict:
+    """Per-call wall time (min/median over ``repeat`` rounds) and peak traced memory"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    gc.collect()
+    rounds = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'min_s': min(rounds),
+        'median_s': statistics.median(rounds),
+        'calls_per_round': number,
+        'peak_bytes': peak,
+    }
+
+
+def load_baseline(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f).get('benchmarks', {})
+
+
+def save_baseline(path: str, results: Dict, merge_into: Dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    benchmarks = {**merge_into, **results}
+    with open(path, 'w') as f:
+        json.dump({
+            'machine': machine_id(),
+            'python': sys.version,
+            'updated_at': datetime.now().isoformat(),
+            'benchmarks': benchmarks,
+        }, f, indent=2, sort_keys=True)
+
+
+def compare(result: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Describe any metric that got worse than the baseline by more than ``threshold``
+
+    With only 5-7 rounds the median moves by more than 20% on a busy machine, so
+    time is judged on the new run's fastest round, and only flagged once even that
+    is slower than the baseline's typical (median) round by more than ``threshold``.
+    """
+    regressions = []
+    if not baseline:
+        return regressions
+    before = baseline.get('median_s')
+    if before and result['min_s'] > before * (1 + threshold):
+        regressions.append(f"min_s {result['min_s'] / before - 1:+.0%} vs baseline median")
+    before = baseline.get('peak_bytes')
+    if before and result['peak_bytes'] > before * (1 + threshold):
+        regressions.append(f"peak_bytes {result['peak_bytes'] / before - 1:+.0%}")
+    return regressions
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks for the lib/python hot paths')
+    parser.add_argument('-k', '--filter', default=None, help='only run benchmarks whose name contains this')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown / memory growth before flagging (0.2 = 20%%)')
+    parser.add_argument('--baseline', default=None, help='baseline file (default: per-machine file)')
+    parser.add_argument('--max-rows', type=int, default=max(AWARD_SIZES),
+                        help='skip award analysis benchmarks above this many rows')
+    args = parser.parse_args()
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{machine_id()}.json")
+    baseline = load_baseline(baseline_path)
+
+    selected = [
+        (name, setup, repeat) for name, setup, repeat in BENCHMARKS
+        if (not args.filter or args.filter in name)
+        and not (name.startswith('usaspending.') and int(name.split('[')[1][:-1]) > args.max_rows)
+    ]
+
+    results = {}
+    regressed = []
+    workdir = tempfile.mkdtemp(prefix='usher_bench_')
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)  # generate_pdf_sow writes relative to cwd
+    try:
+        print(f"{'benchmark':<52}{'median':>12}{'min':>12}{'peak mem':>12}  vs baseline")
+        for name, setup, repeat in selected:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                func = setup()
+                result = measure(func, repeat)
+            results[name] = result
+
+            regressions = compare(result, baseline.get(name), args.threshold)
+            if regressions:
+                regressed.append(name)
+                status = 'REGRESSION ' + ', '.join(regressions)
+            elif name in baseline:
+                status = f"{result['min_s'] / baseline[name]['min_s'] - 1:+.0%} min"
+            else:
+                status = 'no baseline'
+            print(f"{name:<52}{format_time(result['median_s']):>12}{format_time(result['min_s']):>12}"
+                  f"{result['peak_bytes'] / 1024:>9.0f} KB  {status}")
+    finally:
+        os.chdir(previous_cwd)
+
+    if args.save_baseline:
+        save_baseline(baseline_path, results, baseline)
+        print(f"\nBaseline saved to {baseline_path}")
+
+    if regressed and not args.save_baseline:
+        print(f"\n{len(regressed)} benchmark(s) regressed beyond {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 from datetime import datetime
 
+from opportunity_record import OpportunityRecord
+
 class BidAnalyzer:
     def analyze_profitability(self, opportunity, pricing_data):
         """Analyze profitability instead of making binary decisions"""
-        naics_code = (opportunity.get('naicsCode') or 
-                     opportunity.get('naics_code') or 
-                     opportunity.get('naics'))
+        naics_code = OpportunityRecord.coerce(opportunity).naics_code
         
         analysis = {
             'naics_code': naics_code,
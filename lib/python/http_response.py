@@ -0,0 +1,176 @@
+import json
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Preferred order when the client accepts several encodings equally
+_ENCODING_PREFERENCE = ('zstd', 'gzip')
+
+# Bodies smaller than this aren't worth the compression overhead
+MIN_COMPRESS_BYTES = 1024
+
+
+def supported_encodings() -> List[str]:
+    return [enc for enc in _ENCODING_PREFERENCE if enc != 'zstd' or zstandard is not None]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick a content encoding from an Accept-Encoding header, honoring q-values"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def parse_fields(value) -> Optional[List[str]]:
+    """Accept ``fields`` as a list or comma-separated string; None means all fields"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    fields = [field.strip() for field in value if field and field.strip()]
+    return fields or None
+
+
+def wants_ndjson(headers, params: Dict) -> bool:
+    if params.get('stream'):
+        return True
+    return NDJSON_CONTENT_TYPE in (headers.get('Accept') or '')
+
+
+class _Compressor:
+    """Incremental gzip/zstd compressor that can be flushed between chunks"""
+
+    def __init__(self, encoding: Optional[str]):
+        self.encoding = encoding
+        if encoding == 'gzip':
+            self._obj = zlib.compressobj(6, zlib.DEFLATED, 31)
+        elif encoding == 'zstd':
+            self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+        else:
+            self._obj = None
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) if self._obj else data
+
+    def flush(self) -> bytes:
+        """Emit everything buffered so far without ending the stream"""
+        if self.encoding == 'gzip':
+            return self._obj.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == 'zstd':
+            return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return b''
+
+    def finish(self) -> bytes:
+        return self._obj.flush() if self._obj else b''
+
+
+def _cors_headers(handler):
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.send_header('Vary', 'Accept-Encoding')
+
+
+def send_json(handler, status: int, data: Dict):
+    """Write a compact JSON response, compressed if the client asked for it"""
+    body = json.dumps(data, separators=(',', ':')).encode()
+    encoding = negotiate_encoding(handler.headers.get('Accept-Encoding'))
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        compressor = _Compressor(encoding)
+        body = compressor.compress(body) + compressor.finish()
+    else:
+        encoding = None
+
+    handler.send_response(status)
+    handler.send_header('Content-type', 'application/json')
+    if encoding:
+        handler.send_header('Content-Encoding', encoding)
+    handler.send_header('Content-Length', str(len(body)))
+    _cors_headers(handler)
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def stream_ndjson(handler, items: Iterable[Dict], trailer: Dict = None, batch_size: int = 100) -> bool:
+    """
+    Stream ``items`` as newline-delimited JSON using chunked transfer encoding.
+
+    Each batch of ``batch_size`` lines is compressed (if negotiated), flushed and
+    sent as its own chunk so the client can start parsing before the rest is
+    serialized. ``trailer``, if given, is written as the final line. The handler
+    must speak HTTP/1.1 for chunked encoding.
+
+    Only serialization and transfer are overlapped: anything ``items`` needs
+    up front (e.g. the upstream fetch) still happens before the first byte.
+
+    The 200 status is already sent once streaming starts, so errors can't be
+    turned into an error response. If ``items`` raises, the body ends with a
+    ``{"status": "error"}`` line in place of the trailer; if the client goes
+    away, writing stops. Either way the connection is closed afterwards and
+    False is returned.
+    """
+    encoding = negotiate_encoding(handler.headers.get('Accept-Encoding'))
+    compressor = _Compressor(encoding)
+
+    handler.send_response(200)
+    handler.send_header('Content-type', NDJSON_CONTENT_TYPE)
+    handler.send_header('Transfer-Encoding', 'chunked')
+    if encoding:
+        handler.send_header('Content-Encoding', encoding)
+    _cors_headers(handler)
+    handler.end_headers()
+
+    def write_chunk(data: bytes):
+        if data:
+            handler.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    encoder = json.JSONEncoder(separators=(',', ':'))
+    completed = True
+    try:
+        batch = []
+        try:
+            for item in items:
+                batch.append(encoder.encode(item))
+                if len(batch) >= batch_size:
+                    write_chunk(compressor.compress(('\n'.join(batch) + '\n').encode()) + compressor.flush())
+                    handler.wfile.flush()
+                    batch = []
+            if trailer is not None:
+                batch.append(encoder.encode(trailer))
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except Exception as e:
+            print(f"NDJSON stream aborted: {e}")
+            batch.append(encoder.encode({'status': 'error', 'error': str(e)}))
+            completed = False
+        tail = compressor.compress(('\n'.join(batch) + '\n').encode()) if batch else b''
+        write_chunk(tail + compressor.finish())
+        handler.wfile.write(b'0\r\n\r\n')
+        handler.wfile.flush()
+    except (BrokenPipeError, ConnectionResetError):
+        completed = False
+
+    if not completed:
+        handler.close_connection = True
+    return completed
@@ -0,0 +1,352 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+DEFAULT_STORE_PATH = os.getenv('JOB_STORE_PATH', '/tmp/usher_jobs.sqlite')
+
+# With a time budget, leases expire this long after the invocation's deadline,
+# so a unit held by a killed invocation is free again for the next one.
+LEASE_GRACE_SECONDS = 5
+
+# A failed unit isn't leased again for RETRY_BACKOFF_SECONDS * 2**(attempts-1),
+# capped at MAX_RETRY_BACKOFF_SECONDS. The base is longer than a function
+# invocation, so a unit hitting e.g. a SAM.gov 429 waits for a later run
+# instead of burning its attempts within milliseconds.
+RETRY_BACKOFF_SECONDS = 60
+MAX_RETRY_BACKOFF_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_units (
+    job_name      TEXT NOT NULL,
+    unit_key      TEXT NOT NULL,
+    payload       TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    checkpoint    TEXT,
+    result        TEXT,
+    error         TEXT,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    not_before    REAL,
+    updated_at    TEXT NOT NULL,
+    PRIMARY KEY (job_name, unit_key)
+);
+CREATE INDEX IF NOT EXISTS work_units_status ON work_units (job_name, status, lease_expires);
+"""
+
+
+class WorkUnit:
+    """A leased unit of work plus a handle for durably checkpointing progress"""
+
+    __slots__ = ('store', 'job_name', 'key', 'payload', 'checkpoint', 'worker_id',
+                 'lease_seconds', 'deadline', 'attempts')
+
+    def __init__(self, store, job_name, key, payload, checkpoint, worker_id, lease_seconds,
+                 deadline: float = None, attempts: int = 1):
+        self.store = store
+        self.job_name = job_name
+        self.key = key
+        self.payload = payload
+        self.checkpoint = checkpoint
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.deadline = deadline
+        self.attempts = attempts
+
+    def time_left(self) -> Optional[float]:
+        """Seconds until the run's time budget is spent (None if unbounded)"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def save_checkpoint(self, checkpoint: Dict):
+        """Persist progress within the unit and renew the lease"""
+        self.checkpoint = checkpoint
+        if not self.store.save_checkpoint(self.job_name, self.key, self.worker_id, checkpoint,
+                                          lease_duration(self.lease_seconds, self.deadline)):
+            raise LeaseLostError(f"Lease on {self.job_name}/{self.key} was taken by another worker")
+
+    def defer(self):
+        """Stop after the last checkpoint; the unit goes back to pending for the next run"""
+        raise UnitDeferred(self.key)
+
+
+class LeaseLostError(Exception):
+    """Raised when a worker's lease expired and the unit was stolen"""
+
+
+class UnitDeferred(Exception):
+    """Raised by a handler that ran out of time budget part-way through a unit"""
+
+
+def retry_delay(attempts: int, base: float = RETRY_BACKOFF_SECONDS) -> float:
+    """Backoff before a unit that has failed ``attempts`` times may be leased again"""
+    return min(base * 2 ** max(attempts - 1, 0), MAX_RETRY_BACKOFF_SECONDS)
+
+
+def lease_duration(lease_seconds: float, deadline: Optional[float]) -> float:
+    """Lease length, capped to end shortly after the run's deadline when there is one"""
+    if deadline is None:
+        return lease_seconds
+    return min(lease_seconds, max(0.0, deadline - time.monotonic()) + LEASE_GRACE_SECONDS)
+
+
+class JobStore:
+    """SQLite-backed store of work units, leases and checkpoints"""
+
+    def __init__(self, path: str = None):
+        self.path = path or DEFAULT_STORE_PATH
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(work_units)')}
+            if 'not_before' not in columns:  # stores created before retry backoff
+                conn.execute('ALTER TABLE work_units ADD COLUMN not_before REAL')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def add_units(self, job_name: str, units: Iterable[Tuple[str, Dict]]) -> int:
+        """Register work units; units that already exist are left untouched (idempotent)"""
+        now = datetime.now().isoformat()
+        rows = [(job_name, key, json.dumps(payload), now) for key, payload in units]
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO work_units (job_name, unit_key, payload, updated_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            added = conn.total_changes - before
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return added
+
+    def lease(self, job_name: str, worker_id: str, lease_seconds: float,
+              deadline: float = None) -> Optional[WorkUnit]:
+        """
+        Lease the next pending unit, or steal one whose previous lease expired
+        (e.g. the invocation holding it was killed by a timeout). Pending units
+        still backing off after a failure are skipped.
+        """
+        now = time.time()
+        duration = lease_duration(lease_seconds, deadline)
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                """
+                SELECT unit_key, payload, checkpoint, attempts FROM work_units
+                WHERE job_name = ?
+                  AND ((status = 'pending' AND (not_before IS NULL OR not_before <= ?))
+                       OR (status = 'leased' AND lease_expires < ?))
+                ORDER BY status DESC, unit_key
+                LIMIT 1
+                """,
+                (job_name, now, now)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute(
+                """
+                UPDATE work_units
+                SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE job_name = ? AND unit_key = ?
+                """,
+                (worker_id, now + duration, datetime.now().isoformat(), job_name, row[0])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        key, payload, checkpoint, attempts = row
+        return WorkUnit(self, job_name, key, json.loads(payload),
+                        json.loads(checkpoint) if checkpoint else None,
+                        worker_id, lease_seconds, deadline, attempts + 1)
+
+    def save_checkpoint(self, job_name: str, key: str, worker_id: str,
+                        checkpoint: Dict, lease_seconds: float) -> bool:
+        cursor = self._connect().execute(
+            """
+            UPDATE work_units SET checkpoint = ?, lease_expires = ?, updated_at = ?
+            WHERE job_name = ? AND unit_key = ? AND status = 'leased' AND lease_owner = ?
+            """,
+            (json.dumps(checkpoint), time.time() + lease_seconds, datetime.now().isoformat(),
+             job_name, key, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_name: str, key: str, worker_id: str, result: Optional[Dict] = None) -> bool:
+        cursor = self._connect().execute(
+            """
+            UPDATE work_units SET status = 'done', result = ?, error = NULL,
+                lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE job_name = ? AND unit_key = ? AND lease_owner = ?
+            """,
+            (json.dumps(result), datetime.now().isoformat(), job_name, key, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def release(self, job_name: str, key: str, worker_id: str, error: str = None, max_attempts: int = 3,
+                retry_after: float = 0):
+        """
+        Give a unit back after a failure; it keeps its checkpoint for the next
+        attempt, which can't start for ``retry_after`` seconds
+        """
+        self._connect().execute(
+            """
+            UPDATE work_units
+            SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                error = ?, lease_owner = NULL, lease_expires = NULL, not_before = ?, updated_at = ?
+            WHERE job_name = ? AND unit_key = ? AND lease_owner = ?
+            """,
+            (max_attempts, error, time.time() + retry_after, datetime.now().isoformat(),
+             job_name, key, worker_id)
+        )
+
+    def defer(self, job_name: str, key: str, worker_id: str):
+        """Hand an unfinished unit back without counting the attempt against it"""
+        self._connect().execute(
+            """
+            UPDATE work_units
+            SET status = 'pending', attempts = MAX(attempts - 1, 0),
+                lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE job_name = ? AND unit_key = ? AND lease_owner = ?
+            """,
+            (datetime.now().isoformat(), job_name, key, worker_id)
+        )
+
+    def reset_failed(self, job_name: str) -> int:
+        """Make units that ran out of attempts pending again, with a fresh set of attempts"""
+        cursor = self._connect().execute(
+            """
+            UPDATE work_units SET status = 'pending', attempts = 0, not_before = NULL, updated_at = ?
+            WHERE job_name = ? AND status = 'failed'
+            """,
+            (datetime.now().isoformat(), job_name)
+        )
+        return cursor.rowcount
+
+    def progress(self, job_name: str) -> Dict:
+        """Count units by status for a job"""
+        rows = self._connect().execute(
+            "SELECT status, COUNT(*) FROM work_units WHERE job_name = ? GROUP BY status",
+            (job_name,)
+        ).fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        counts['total'] = sum(count for status, count in rows)
+        counts['backing_off'] = self._connect().execute(
+            "SELECT COUNT(*) FROM work_units WHERE job_name = ? AND status = 'pending' AND not_before > ?",
+            (job_name, time.time())
+        ).fetchone()[0]
+        # Units that exhausted max_attempts keep the job incomplete until reset_failed()
+        counts['complete'] = counts['pending'] == 0 and counts['leased'] == 0 and counts['failed'] == 0
+        return counts
+
+
+class JobRunner:
+    """
+    Runs a job's work units until they are all done or the time budget runs out.
+
+    Each unit is handled by ``handler(unit)``; the handler may call
+    ``unit.save_checkpoint(...)`` as it goes and read ``unit.checkpoint`` to pick
+    up where a previous (possibly killed) attempt stopped. Whatever the handler
+    returns is stored as the unit's result. Handlers must be idempotent, since a
+    unit interrupted between checkpoints is replayed from its last checkpoint,
+    and anything a handler wants to survive a crash must be written durably
+    before it checkpoints past it.
+
+    Long units should check ``unit.time_left()`` between steps and call
+    ``unit.defer()`` once the budget is spent.
+
+    A unit whose handler raises is retried with exponential backoff starting
+    at ``retry_backoff`` seconds, and marked failed after ``max_attempts``.
+    """
+
+    def __init__(self, job_name: str, handler: Callable[[WorkUnit], Optional[Dict]],
+                 store: JobStore = None, lease_seconds: float = 120, max_attempts: int = 3,
+                 retry_backoff: float = RETRY_BACKOFF_SECONDS):
+        self.job_name = job_name
+        self.handler = handler
+        self.store = store or JobStore()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    def plan(self, units: Iterable[Tuple[str, Dict]]) -> int:
+        """Add work units (key, payload); re-planning the same keys is a no-op"""
+        return self.store.add_units(self.job_name, units)
+
+    def run(self, time_budget: float = None, workers: int = 1) -> Dict:
+        """
+        Process units with ``workers`` threads. No new unit is leased once
+        ``time_budget`` seconds have elapsed, so a serverless invocation can stop
+        cleanly and the next one resumes with whatever is left. Leases taken
+        under a budget expire shortly after it, not after ``lease_seconds``.
+
+        Returns this run's counters (``errors`` counts failed attempts) merged
+        with ``JobStore.progress`` (``failed`` counts units out of attempts).
+        """
+        deadline = time.monotonic() + time_budget if time_budget else None
+        stats = {'processed': 0, 'errors': 0, 'lost': 0, 'deferred': 0}
+        lock = threading.Lock()
+
+        def count(field):
+            with lock:
+                stats[field] += 1
+
+        def work():
+            worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            while deadline is None or time.monotonic() < deadline:
+                unit = self.store.lease(self.job_name, worker_id, self.lease_seconds, deadline)
+                if unit is None:
+                    return
+                try:
+                    result = self.handler(unit)
+                except LeaseLostError:
+                    count('lost')
+                    continue
+                except UnitDeferred:
+                    self.store.defer(self.job_name, unit.key, worker_id)
+                    count('deferred')
+                    return
+                except Exception as e:
+                    print(f"Job {self.job_name} unit {unit.key} failed: {e}")
+                    self.store.release(self.job_name, unit.key, worker_id, str(e), self.max_attempts,
+                                       retry_delay(unit.attempts, self.retry_backoff))
+                    count('errors')
+                    continue
+                if self.store.complete(self.job_name, unit.key, worker_id, result):
+                    count('processed')
+                else:
+                    count('lost')
+
+        if workers <= 1:
+            work()
+        else:
+            threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        stats.update(self.store.progress(self.job_name))
+        return stats
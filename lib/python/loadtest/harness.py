@@ -0,0 +1,222 @@
+import argparse
+import contextlib
+import http.client
+import importlib.util
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+LIB_DIR = os.path.join(os.path.dirname(__file__), '..')
+API_DIR = os.path.join(LIB_DIR, '../../api/python')
+sys.path.insert(0, os.path.abspath(LIB_DIR))
+
+from loadtest.stub_upstream import StubUpstream
+
+SAMPLE_RFP = {
+    'title': 'Facilities Support Services',
+    'solicitation_number': 'W912DY-26-R-0001',
+    'naics_code': '561210',
+    'agency': 'Department of the Army',
+}
+
+
+@contextlib.contextmanager
+def silenced(enabled: bool = True):
+    """Swallow the clients' progress prints and the handlers' request logs"""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        yield
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already-sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_load(operation: Callable[[], bool], total_requests: int, concurrency: int,
+             warmup: int = 0) -> Dict:
+    """
+    Call ``operation`` ``total_requests`` times across ``concurrency`` threads.
+    ``operation`` returns True on success; False or an exception counts as an error.
+    """
+    for _ in range(warmup):
+        operation()
+
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def timed(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            ok = operation()
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(total_requests)))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        'requests': total_requests,
+        'concurrency': concurrency,
+        'errors': errors,
+        'error_rate': round(errors / total_requests, 4) if total_requests else 0,
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(total_requests / wall, 2) if wall else 0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0,
+    }
+
+
+def serve_endpoint(filename: str) -> ThreadingHTTPServer:
+    """Load an api/python handler module and serve it on a local port"""
+    path = os.path.abspath(os.path.join(API_DIR, filename))
+    spec = importlib.util.spec_from_file_location(f"endpoint_{filename[:-3]}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), module.handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def post_json(server: ThreadingHTTPServer, payload: Dict, headers: Dict = None) -> bool:
+    host, port = server.server_address[:2]
+    body = json.dumps(payload)
+    conn = http.client.HTTPConnection(host, port, timeout=120)
+    try:
+        conn.request('POST', '/', body, {'Content-Type': 'application/json',
+                                         'Content-Length': str(len(body)), **(headers or {})})
+        response = conn.getresponse()
+        response.read()
+        return response.status == 200
+    finally:
+        conn.close()
+
+
+def fetch_opportunities_target(stream: bool = False) -> Callable[[], bool]:
+    server = serve_endpoint('fetch_opportunities.py')
+    payload = {'limit': 1000, 'posted_days_ago': 60, 'min_deadline_days': 0, 'stream': stream}
+    return lambda: post_json(server, payload, {'Accept-Encoding': 'gzip'})
+
+
+def sync_opportunities_target() -> Callable[[], bool]:
+    # Never let a DATABASE_URL from .env point the load test at a real database
+    database = os.path.join(tempfile.mkdtemp(prefix='usher_loadtest_sync_'), 'opportunities.sqlite')
+    os.environ['DATABASE_URL'] = f"sqlite:///{database}"
+    server = serve_endpoint('sync_opportunities.py')
+    # dry_run gives every request its own job store, so each one pages the whole fixture
+    payload = {'posted_days_ago': 1, 'window_days': 1, 'page_size': 10, 'dry_run': True}
+    return lambda: post_json(server, payload)
+
+
+def generate_sow_target() -> Callable[[], bool]:
+    server = serve_endpoint('generate_sow.py')
+    payload = {'rfp_data': SAMPLE_RFP, 'subcontractor': {'name': 'Load Test Subcontractor'}}
+    return lambda: post_json(server, payload)
+
+
+def pricing_target() -> Callable[[], bool]:
+    from api.usaspending_client import USASpendingClient
+    from pricing_engine import PricingEngine
+
+    def operation():
+        awards = USASpendingClient().get_historical_awards(naics_code=SAMPLE_RFP['naics_code'])
+        engine = PricingEngine()
+        quotes = engine.simulate_subcontractor_quotes(SAMPLE_RFP['naics_code'])
+        price = engine.calculate_optimal_price(quotes, SAMPLE_RFP['naics_code'])
+        return bool(awards and awards.get('total_awards')) and price['recommended_price'] > 0
+
+    return operation
+
+
+TARGETS = {
+    'fetch_opportunities': fetch_opportunities_target,
+    'fetch_opportunities_stream': lambda: fetch_opportunities_target(stream=True),
+    'sync_opportunities': sync_opportunities_target,
+    'generate_sow': generate_sow_target,
+    'pricing': pricing_target,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the Python endpoints against recorded upstreams')
+    parser.add_argument('targets', nargs='*', default=['fetch_opportunities', 'sync_opportunities', 'generate_sow', 'pricing'],
+                        help=f"any of: {', '.join(TARGETS)}")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--fixtures', default=None, help='directory of recorded upstream responses')
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=10)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path', default=None, help='write results to this file')
+    parser.add_argument('--verbose', action='store_true', help="don't silence client/endpoint output")
+    args = parser.parse_args()
+
+    unknown = [target for target in args.targets if target not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+
+    results = {}
+    with StubUpstream(fixture_dir=args.fixtures, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                      error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                      seed=args.seed) as stub:
+        stub.configure_clients()
+        os.environ.setdefault('SAM_API_KEY', 'loadtest')
+
+        workdir = tempfile.mkdtemp(prefix='usher_loadtest_')
+        previous_cwd = os.getcwd()
+        os.chdir(workdir)  # generate_sow writes its PDFs relative to cwd
+        try:
+            for name in args.targets:
+                print(f"Running {name}: {args.requests} requests @ concurrency {args.concurrency}...")
+                with silenced(not args.verbose):
+                    before = dict(stub.stats)
+                    operation = TARGETS[name]()
+                    result = run_load(operation, args.requests, args.concurrency, args.warmup)
+                    result['upstream'] = {key: stub.stats[key] - before[key] for key in stub.stats}
+                results[name] = result
+        finally:
+            os.chdir(previous_cwd)
+
+    print()
+    print(f"{'target':<28}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, result in results.items():
+        print(f"{name:<28}{result['throughput_rps']:>10}{result['p50_ms']:>10}"
+              f"{result['p95_ms']:>10}{result['p99_ms']:>10}{result['errors']:>8}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import argparse
+import glob
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlparse
+
+import requests
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def load_fixtures(fixture_dir: str = None) -> Dict:
+    """
+    Load recorded responses keyed by (METHOD, path).
+
+    Each fixture file is JSON: {"method", "path", "status", "headers", "body"},
+    plus an optional "paginate" naming a list in the body that is sliced by
+    the request's limit/offset query parameters.
+    """
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(fixture_dir or FIXTURE_DIR, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            fixture = json.load(f)
+        body = fixture.get('body')
+        fixture['encoded_body'] = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        fixtures[(fixture.get('method', 'GET').upper(), fixture['path'])] = fixture
+    return fixtures
+
+
+def record_fixture(name: str, method: str, url: str, fixture_dir: str = None, paginate: str = None,
+                   **request_kwargs) -> str:
+    """Call a real upstream once and save the response as a replayable fixture"""
+    response = requests.request(method, url, timeout=60, **request_kwargs)
+    try:
+        body = response.json()
+    except ValueError:
+        body = response.text
+    fixture = {
+        'method': method.upper(),
+        'path': urlparse(url).path,
+        'status': response.status_code,
+        'headers': {'Content-Type': response.headers.get('Content-Type', 'application/json')},
+        'body': body,
+    }
+    if paginate:
+        fixture['paginate'] = paginate
+    path = os.path.join(fixture_dir or FIXTURE_DIR, f"{name}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(fixture, f, indent=2)
+    return path
+
+
+class StubUpstream:
+    """
+    Local stand-in for SAM.gov and USASpending.
+
+    Replays recorded fixtures with configurable latency, plus randomly injected
+    5xx errors and 429 rate-limit responses. Seeded, so runs are reproducible.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, fixture_dir: str = None,
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: Optional[int] = 0):
+        self.fixtures = load_fixtures(fixture_dir)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors_injected': 0, 'rate_limited': 0, 'not_found': 0}
+        self._pages = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure_clients(self):
+        """Point SAMClient / USASpendingClient (via env) at this stand-in"""
+        os.environ['SAM_API_BASE_URL'] = f"{self.base_url}/opportunities/v2"
+        os.environ['USASPENDING_BASE_URL'] = self.base_url
+
+    def start(self) -> 'StubUpstream':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _page(self, fixture: Dict, query: str) -> bytes:
+        """Body for a paginated fixture, sliced like SAM.gov's limit/offset search"""
+        params = dict(parse_qsl(query))
+        try:
+            limit = int(params['limit'])
+            offset = int(params.get('offset', 0))
+        except (KeyError, ValueError):
+            return fixture['encoded_body']
+
+        key = (fixture['path'], limit, offset)
+        if key not in self._pages:
+            items = fixture['body'][fixture['paginate']]
+            body = {**fixture['body'], fixture['paginate']: items[offset:offset + limit],
+                    'limit': limit, 'offset': offset}
+            self._pages[key] = json.dumps(body).encode()
+        return self._pages[key]
+
+    def _roll(self):
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+            outcome = self._random.random()
+        if outcome < self.rate_limit_rate:
+            return delay, 429
+        if outcome < self.rate_limit_rate + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, status: int, body: bytes, headers: Dict = None):
+                self.send_response(status)
+                for name, value in (headers or {'Content-Type': 'application/json'}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _serve(self, method: str):
+                length = int(self.headers.get('Content-Length', 0))
+                if length:
+                    self.rfile.read(length)
+
+                stub._count('requests')
+                delay, injected = stub._roll()
+                if delay:
+                    time.sleep(delay / 1000.0)
+
+                if injected == 429:
+                    stub._count('rate_limited')
+                    return self._respond(429, b'{"error":"Too Many Requests"}',
+                                         {'Content-Type': 'application/json', 'Retry-After': '1'})
+                if injected == 500:
+                    stub._count('errors_injected')
+                    return self._respond(500, b'{"error":"Injected upstream error"}')
+
+                url = urlparse(self.path)
+                fixture = stub.fixtures.get((method, url.path))
+                if fixture is None:
+                    stub._count('not_found')
+                    return self._respond(404, b'{"error":"No fixture recorded for this route"}')
+                body = stub._page(fixture, url.query) if fixture.get('paginate') else fixture['encoded_body']
+                self._respond(fixture.get('status', 200), body, fixture.get('headers'))
+
+            def do_GET(self):
+                self._serve('GET')
+
+            def do_POST(self):
+                self._serve('POST')
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded SAM.gov / USASpending responses')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=None)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    stub = StubUpstream(port=args.port, fixture_dir=args.fixtures, latency_ms=args.latency_ms,
+                        jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                        rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+    print(f"Stand-in upstream listening on {stub.base_url} ({len(stub.fixtures)} fixtures)")
+    print(f"  SAM_API_BASE_URL={stub.base_url}/opportunities/v2")
+    print(f"  USASPENDING_BASE_URL={stub.base_url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
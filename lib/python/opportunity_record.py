@@ -0,0 +1,288 @@
+import json
+import sys
+import zlib
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
+
+
+# SAM.gov and internal callers spell the same field several ways; every
+# spelling maps to exactly one slot, earlier spellings taking precedence.
+FIELD_ALIASES = {
+    'solicitation_number': ('solicitationNumber', 'solicitation_number', 'solNumber'),
+    'notice_id': ('noticeId', 'notice_id'),
+    'title': ('title',),
+    'naics_code': ('naicsCode', 'naics_code', 'naics', 'classificationCode'),
+    'agency': ('fullParentPathName', 'organizationName', 'agency'),
+    'department': ('department',),
+    'state': ('state',),
+    'notice_type': ('type', 'baseType', 'notice_type'),
+    'set_aside': ('typeOfSetAside', 'setAside', 'set_aside'),
+    'posted_date': ('postedDate', 'posted_date'),
+    'response_deadline': ('responseDeadLine', 'responseDeadline', 'response_deadline'),
+    'description_url': ('description', 'additionalInfoLink', 'description_url'),
+    'ui_link': ('uiLink', 'ui_link'),
+    'resource_links': ('resourceLinks', 'resource_links'),
+}
+
+_DATE_SLOTS = ('posted_date', 'response_deadline')
+
+# SAM.gov builds these links from ids the record already holds. Links in
+# exactly this form are stored as a marker / bare file ids and rebuilt on access.
+DESCRIPTION_URL_TEMPLATE = 'https://api.sam.gov/prod/opportunities/v1/noticedesc?noticeid={}'
+UI_LINK_TEMPLATE = 'https://sam.gov/opp/{}/view'
+RESOURCE_LINK_PREFIX = 'https://sam.gov/api/prod/opps/v3/opportunities/resources/files/'
+RESOURCE_LINK_SUFFIX = '/download'
+_CANONICAL = object()
+
+# Slots stored in a compact private form behind a property of the same name
+_COMPACT_SLOTS = ('description_url', 'ui_link', 'resource_links')
+
+
+def parse_sam_date(value) -> Optional[datetime]:
+    """Parse a SAM.gov date/datetime string into a naive UTC datetime"""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value, '%m/%d/%Y')
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@lru_cache(maxsize=4096)
+def _parse_shared(value: str) -> Optional[datetime]:
+    # datetimes are immutable, so records posted / due at the same time share one
+    return parse_sam_date(value)
+
+
+def _shared(value):
+    # naics_code, agency, set_aside, ... take few distinct values across
+    # thousands of records; interning makes them share one string per value
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _compact_link(value, template: str, notice_id):
+    if value is not None and notice_id and value == template.format(notice_id):
+        return _CANONICAL
+    return value
+
+
+def _compact_resource_links(links):
+    """File ids joined by spaces when every link is a plain SAM file link, else a tuple"""
+    if not links:
+        return None
+    if isinstance(links, str):
+        links = [links]
+    ids = []
+    for link in links:
+        if not (isinstance(link, str) and link.startswith(RESOURCE_LINK_PREFIX)
+                and link.endswith(RESOURCE_LINK_SUFFIX)):
+            return tuple(links)
+        file_id = link[len(RESOURCE_LINK_PREFIX):-len(RESOURCE_LINK_SUFFIX)]
+        if not file_id or '/' in file_id or ' ' in file_id:
+            return tuple(links)
+        ids.append(file_id)
+    return ' '.join(ids)
+
+
+def _state_of(value) -> Optional[str]:
+    """Pull a state code out of placeOfPerformance / officeAddress shapes"""
+    if isinstance(value, str):
+        return value or None
+    if isinstance(value, dict):
+        state = value.get('state')
+        if isinstance(state, dict):
+            return state.get('code') or state.get('name')
+        return state or None
+    return None
+
+
+class OpportunityRecord:
+    """
+    Compact, projected view of a single SAM.gov opportunity.
+
+    Only the fields the pipeline actually uses are kept. Dates are parsed once
+    (and shared between records with the same timestamp), repeated categorical
+    strings are interned, and description/UI/attachment links that follow
+    SAM.gov's URL scheme are rebuilt from their ids on access. The full SAM
+    payload is optionally retained as zlib-compressed JSON that is only
+    decoded when ``raw`` is accessed.
+
+    Records are treated as immutable once built: links stored in compact form
+    are derived from ``notice_id``.
+    """
+
+    __slots__ = tuple(slot for slot in FIELD_ALIASES if slot not in _COMPACT_SLOTS) + \
+        tuple('_' + slot for slot in _COMPACT_SLOTS) + ('_raw',)
+
+    def __init__(self, **fields):
+        self._assign(fields)
+        self._raw = None
+
+    def _assign(self, values: Dict):
+        get = values.get
+        notice_id = get('notice_id')
+        self.solicitation_number = get('solicitation_number')
+        self.notice_id = notice_id
+        self.title = get('title')
+        self.naics_code = _shared(get('naics_code'))
+        self.agency = _shared(get('agency'))
+        self.department = _shared(get('department'))
+        self.state = _shared(get('state'))
+        self.notice_type = _shared(get('notice_type'))
+        self.set_aside = _shared(get('set_aside'))
+        self.posted_date = get('posted_date')
+        self.response_deadline = get('response_deadline')
+        self._description_url = _compact_link(get('description_url'), DESCRIPTION_URL_TEMPLATE, notice_id)
+        self._ui_link = _compact_link(get('ui_link'), UI_LINK_TEMPLATE, notice_id)
+        self._resource_links = _compact_resource_links(get('resource_links'))
+
+    @property
+    def description_url(self) -> Optional[str]:
+        value = self._description_url
+        return DESCRIPTION_URL_TEMPLATE.format(self.notice_id) if value is _CANONICAL else value
+
+    @property
+    def ui_link(self) -> Optional[str]:
+        value = self._ui_link
+        return UI_LINK_TEMPLATE.format(self.notice_id) if value is _CANONICAL else value
+
+    @property
+    def resource_links(self) -> Optional[List[str]]:
+        value = self._resource_links
+        if isinstance(value, str):
+            return [f"{RESOURCE_LINK_PREFIX}{file_id}{RESOURCE_LINK_SUFFIX}" for file_id in value.split(' ')]
+        return list(value) if value is not None else None
+
+    @classmethod
+    def from_dict(cls, data: Dict, keep_raw: bool = False) -> 'OpportunityRecord':
+        """Build a record from an already-decoded opportunity dict"""
+        values = {}
+        for slot, aliases in FIELD_ALIASES.items():
+            # Earlier aliases win, matching the `a or b or c` lookups this replaces
+            for alias in aliases:
+                value = data.get(alias)
+                if value is None or value == '':
+                    continue
+                if slot == 'description_url' and not isinstance(value, str):
+                    value = value.get('body') if isinstance(value, dict) else None
+                    if not value:
+                        # e.g. a description object without a body; let later aliases fill the slot
+                        continue
+                elif isinstance(value, (int, float)):
+                    value = str(value)
+                values[slot] = value
+                break
+
+        if values.get('state') is None:
+            values['state'] = _state_of(data.get('placeOfPerformance')) or _state_of(data.get('officeAddress'))
+        if values.get('solicitation_number') is None:
+            values['solicitation_number'] = values.get('notice_id')
+        if values.get('department') is None and values.get('agency'):
+            values['department'] = values['agency'].split('.')[0]
+        for slot in _DATE_SLOTS:
+            value = values.get(slot)
+            if isinstance(value, str):
+                values[slot] = _parse_shared(value)
+
+        record = cls.__new__(cls)
+        record._assign(values)
+        record._raw = None
+        if keep_raw:
+            record._raw = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        return record
+
+    @classmethod
+    def from_pairs(cls, pairs, keep_raw: bool = False) -> 'OpportunityRecord':
+        """Build a record from decoded JSON key/value pairs"""
+        return cls.from_dict(dict(pairs), keep_raw=keep_raw)
+
+    @classmethod
+    def coerce(cls, opportunity: Union['OpportunityRecord', Dict], keep_raw: bool = False) -> 'OpportunityRecord':
+        """Return ``opportunity`` as a record, converting plain dicts on the way in"""
+        if isinstance(opportunity, cls):
+            return opportunity
+        return cls.from_dict(opportunity or {}, keep_raw=keep_raw)
+
+    @property
+    def raw(self) -> Optional[Dict]:
+        """Full SAM.gov payload, decompressed on demand (None unless keep_raw was set)"""
+        if self._raw is None:
+            return None
+        return json.loads(zlib.decompress(self._raw))
+
+    @property
+    def raw_json(self) -> Optional[str]:
+        """Full SAM.gov payload as the compact JSON it is stored as, without re-parsing"""
+        if self._raw is None:
+            return None
+        return zlib.decompress(self._raw).decode('utf-8')
+
+    def to_dict(self, fields: Optional[List[str]] = None) -> Dict:
+        """JSON-ready dict of the projected fields (optionally only ``fields``)"""
+        data = {}
+        for slot in fields or FIELD_ALIASES:
+            if slot not in FIELD_ALIASES:
+                continue
+            value = getattr(self, slot)
+            data[slot] = value.isoformat() if isinstance(value, datetime) else value
+        return data
+
+    def to_rfp_data(self) -> Dict:
+        """Shape expected by SOWGeneratorPDF.generate_pdf_sow"""
+        return {
+            'title': self.title,
+            'solicitation_number': self.solicitation_number,
+            'naics_code': self.naics_code,
+            'agency': self.agency,
+            'state': self.state,
+        }
+
+    def __repr__(self):
+        return f"OpportunityRecord({self.solicitation_number!r}, {self.title!r})"
+
+
+def decode_search_page(body: Union[bytes, str], keep_raw: bool = False) -> Dict:
+    """
+    Decode a SAM.gov search response straight into OpportunityRecords.
+
+    Opportunity objects are projected as soon as the JSON decoder finishes them,
+    so the full per-opportunity dicts never accumulate in memory (only one is
+    alive at a time). Besides the
+    records, returns SAM's ``total_records`` and the raw ``page_count`` (items
+    in opportunitiesData, including any that could not be projected) so callers
+    can page without drifting.
+    """
+    def hook(obj):
+        if 'noticeId' in obj:
+            return OpportunityRecord.from_dict(obj, keep_raw=keep_raw)
+        return obj
+
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    data = json.loads(body, object_hook=hook)
+
+    total_records = None
+    if isinstance(data, list):
+        items = data
+    elif isinstance(data, dict):
+        items = data.get('opportunitiesData') or []
+        total_records = data.get('totalRecords')
+    else:
+        items = []
+    return {
+        'records': [item for item in items if isinstance(item, OpportunityRecord)],
+        'total_records': total_records if isinstance(total_records, int) else None,
+        'page_count': len(items),
+    }
+
+
+def decode_opportunities(body: Union[bytes, str], keep_raw: bool = False) -> List[OpportunityRecord]:
+    """Decode a SAM.gov search response into OpportunityRecords (see decode_search_page)"""
+    return decode_search_page(body, keep_raw=keep_raw)['records']
@@ -0,0 +1,306 @@
+import csv
+import io
+import os
+import secrets
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from opportunity_record import OpportunityRecord
+
+try:
+    import psycopg2
+    import psycopg2.pool
+except ImportError:  # only needed when writing to Postgres
+    psycopg2 = None
+
+DESCRIPTION_MAX_LENGTH = 10000  # same cap as app/api/opportunities/fetch/route.ts
+
+# Prisma-only connection-string options that libpq rejects
+_PRISMA_URL_PARAMS = ('pgbouncer', 'connection_limit', 'pool_timeout', 'schema', 'statement_cache_size')
+
+STAGING_COLUMNS = (
+    'id', 'solicitationNumber', 'title', 'description', 'naicsCode', 'agency',
+    'department', 'state', 'postedDate', 'responseDeadline', 'rawData',
+)
+
+_POSTGRES_STAGING = """
+CREATE TEMP TABLE opportunities_staging (
+    id                   TEXT NOT NULL,
+    "solicitationNumber" TEXT NOT NULL,
+    title                TEXT NOT NULL,
+    description          TEXT,
+    "naicsCode"          TEXT,
+    agency               TEXT,
+    department           TEXT,
+    state                TEXT,
+    "postedDate"         TIMESTAMP(3),
+    "responseDeadline"   TIMESTAMP(3),
+    "rawData"            JSONB
+) ON COMMIT DROP
+"""
+
+_SQLITE_STAGING = """
+CREATE TEMP TABLE IF NOT EXISTS opportunities_staging (
+    id                   TEXT NOT NULL,
+    "solicitationNumber" TEXT NOT NULL,
+    title                TEXT NOT NULL,
+    description          TEXT,
+    "naicsCode"          TEXT,
+    agency               TEXT,
+    department           TEXT,
+    state                TEXT,
+    "postedDate"         TEXT,
+    "responseDeadline"   TEXT,
+    "rawData"            TEXT
+)
+"""
+
+# Local stand-in for the Prisma `Opportunity` model (@@map("opportunities"))
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS opportunities (
+    id                   TEXT PRIMARY KEY,
+    "solicitationNumber" TEXT NOT NULL UNIQUE,
+    title                TEXT NOT NULL,
+    description          TEXT,
+    "naicsCode"          TEXT,
+    agency               TEXT,
+    department           TEXT,
+    state                TEXT,
+    "postedDate"         TEXT,
+    "responseDeadline"   TEXT,
+    "lastFetched"        TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    status               TEXT NOT NULL DEFAULT 'ACTIVE',
+    "rawData"            TEXT,
+    "parsedAttachments"  TEXT,
+    "opportunityBrief"   TEXT,
+    "createdAt"          TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updatedAt"          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS opportunities_response_deadline ON opportunities ("responseDeadline");
+CREATE INDEX IF NOT EXISTS opportunities_status ON opportunities (status);
+CREATE INDEX IF NOT EXISTS opportunities_naics_code ON opportunities ("naicsCode");
+"""
+
+_COUNT_NEW = """
+SELECT COUNT(*) FROM opportunities_staging s
+WHERE NOT EXISTS (
+    SELECT 1 FROM opportunities o WHERE o."solicitationNumber" = s."solicitationNumber"
+)
+"""
+
+# A single set-based merge keyed on the unique solicitation number. A URL
+# description never overwrites text that has already been backfilled.
+_MERGE = """
+INSERT INTO opportunities (
+    id, "solicitationNumber", title, description, "naicsCode", agency, department, state,
+    "postedDate", "responseDeadline", "lastFetched", status, "rawData", "createdAt", "updatedAt"
+)
+SELECT
+    id, "solicitationNumber", title, description, "naicsCode", agency, department, state,
+    "postedDate", "responseDeadline", CURRENT_TIMESTAMP, {active}, "rawData", CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+FROM opportunities_staging
+WHERE true
+ON CONFLICT ("solicitationNumber") DO UPDATE SET
+    title = excluded.title,
+    description = CASE
+        WHEN excluded.description LIKE 'http%'
+             AND opportunities.description IS NOT NULL
+             AND opportunities.description NOT LIKE 'http%'
+        THEN opportunities.description
+        ELSE excluded.description
+    END,
+    "naicsCode" = excluded."naicsCode",
+    agency = excluded.agency,
+    department = excluded.department,
+    state = excluded.state,
+    "postedDate" = excluded."postedDate",
+    "responseDeadline" = excluded."responseDeadline",
+    "lastFetched" = excluded."lastFetched",
+    status = excluded.status,
+    "rawData" = COALESCE(excluded."rawData", opportunities."rawData"),
+    "updatedAt" = excluded."updatedAt"
+"""
+
+
+def new_id() -> str:
+    """cuid-shaped id for rows created outside Prisma (Prisma generates @default(cuid()) client-side)"""
+    return 'c' + secrets.token_hex(12)
+
+
+def libpq_dsn(url: str) -> str:
+    """Strip Prisma-specific query parameters from a Postgres connection URL"""
+    parsed = urlparse(url)
+    query = [(key, value) for key, value in parse_qsl(parsed.query) if key not in _PRISMA_URL_PARAMS]
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+def sqlite_path(dsn: str) -> str:
+    """sqlite:///relative.db, sqlite:////abs/path.db or sqlite:// (in-memory)"""
+    path = dsn[len('sqlite:///'):] if dsn.startswith('sqlite:///') else ''
+    return path if path and path != ':memory:' else ':memory:'
+
+
+class _SQLitePool:
+    """Single shared connection exposing the psycopg2 pool interface"""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SQLITE_SCHEMA)
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        self._lock.acquire()
+        return self._conn
+
+    def putconn(self, conn):
+        self._lock.release()
+
+    def closeall(self):
+        self._conn.close()
+
+
+class OpportunitySink:
+    """
+    Bulk upsert of harvested opportunities into the `opportunities` table.
+
+    Each batch is loaded into a staging table (COPY on Postgres, executemany on
+    the SQLite stand-in) and merged with one INSERT ... ON CONFLICT keyed on
+    "solicitationNumber". With ``dry_run`` every batch is rolled back after the
+    merge, so counts are real but nothing is persisted.
+
+    ``dsn`` is a postgresql:// URL (defaults to DATABASE_URL) or sqlite:///path.
+
+    "rawData" comes from ``record.raw_json``, so records must be decoded with
+    ``keep_raw=True`` (plain SAM dicts always keep theirs). Records without it
+    insert NULL and leave an existing row's rawData untouched.
+    """
+
+    def __init__(self, dsn: str = None, batch_size: int = 5000, max_connections: int = 4,
+                 dry_run: bool = False):
+        self.dsn = dsn or os.getenv('DATABASE_URL')
+        if not self.dsn:
+            raise ValueError('OpportunitySink needs a dsn or DATABASE_URL')
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+        if self.dsn.startswith('sqlite:'):
+            self.backend = 'sqlite'
+            self._pool = _SQLitePool(sqlite_path(self.dsn))
+        else:
+            if psycopg2 is None:
+                raise ImportError('psycopg2 is required to write opportunities to Postgres')
+            self.backend = 'postgres'
+            self._pool = psycopg2.pool.ThreadedConnectionPool(1, max_connections, libpq_dsn(self.dsn))
+
+    def close(self):
+        self._pool.closeall()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.getconn()
+        try:
+            yield conn
+        finally:
+            self._pool.putconn(conn)
+
+    def write(self, opportunities: Iterable) -> Dict:
+        """Upsert ``opportunities`` (records or SAM dicts) in batches; returns counts"""
+        totals = {'received': 0, 'skipped': 0, 'inserted': 0, 'updated': 0, 'batches': 0,
+                  'dry_run': self.dry_run}
+        batch = {}
+        for opportunity in opportunities:
+            totals['received'] += 1
+            row = self._row(OpportunityRecord.coerce(opportunity, keep_raw=True))
+            if row is None:
+                totals['skipped'] += 1
+                continue
+            # Last occurrence wins; ON CONFLICT can't touch the same row twice per statement
+            batch[row[1]] = row
+            if len(batch) >= self.batch_size:
+                self._merge_into(totals, list(batch.values()))
+                batch = {}
+        if batch:
+            self._merge_into(totals, list(batch.values()))
+        return totals
+
+    def _merge_into(self, totals: Dict, rows: List[tuple]):
+        inserted = self.write_batch(rows)
+        totals['inserted'] += inserted
+        totals['updated'] += len(rows) - inserted
+        totals['batches'] += 1
+
+    def write_batch(self, rows: List[tuple]) -> int:
+        """Stage and merge one batch of rows in a single transaction; returns rows inserted"""
+        with self._connection() as conn:
+            try:
+                cursor = conn.cursor()
+                if self.backend == 'postgres':
+                    cursor.execute(_POSTGRES_STAGING)
+                    cursor.copy_expert(
+                        'COPY opportunities_staging ({}) FROM STDIN WITH (FORMAT csv)'.format(
+                            ', '.join(f'"{column}"' for column in STAGING_COLUMNS)),
+                        self._csv(rows)
+                    )
+                    merge = _MERGE.format(active="'ACTIVE'::\"OpportunityStatus\"")
+                else:
+                    cursor.execute(_SQLITE_STAGING)
+                    # Take the write lock up front; upgrading from a read lock mid-merge
+                    # fails with "database is locked" when another writer is active
+                    cursor.execute('BEGIN IMMEDIATE')
+                    cursor.execute('DELETE FROM opportunities_staging')
+                    cursor.executemany(
+                        'INSERT INTO opportunities_staging VALUES ({})'.format(', '.join('?' * len(STAGING_COLUMNS))),
+                        rows
+                    )
+                    merge = _MERGE.format(active="'ACTIVE'")
+
+                cursor.execute(_COUNT_NEW)
+                inserted = cursor.fetchone()[0]
+                cursor.execute(merge)
+
+                if self.dry_run:
+                    conn.rollback()
+                else:
+                    conn.commit()
+                return inserted
+            except Exception:
+                conn.rollback()
+                raise
+
+    @staticmethod
+    def _csv(rows: List[tuple]) -> io.StringIO:
+        # Unquoted empty fields are NULL in COPY csv format
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+        buffer.seek(0)
+        return buffer
+
+    @staticmethod
+    def _row(record: OpportunityRecord) -> Optional[tuple]:
+        if not record.solicitation_number:
+            return None
+        description = record.description_url
+        return (
+            new_id(),
+            record.solicitation_number,
+            record.title or 'Untitled',
+            description[:DESCRIPTION_MAX_LENGTH] if description else None,
+            record.naics_code,
+            record.agency,
+            record.department,
+            record.state,
+            record.posted_date.isoformat() if record.posted_date else None,
+            record.response_deadline.isoformat() if record.response_deadline else None,
+            record.raw_json,
+        )
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from api.sam_client import SAMClient
+from job_runner import JobRunner, JobStore, WorkUnit
+from opportunity_record import OpportunityRecord
+
+# Don't start a SAM page request with less budget left than this
+MIN_PAGE_SECONDS = 5
+SAM_REQUEST_TIMEOUT = 60
+
+
+class OpportunitySyncJob:
+    """
+    Daily SAM.gov sync / backfill split into resumable work units.
+
+    Each unit covers a posted-date window; within a unit the SAM page offset is
+    checkpointed after every page, so an interrupted run resumes at the next
+    page instead of refetching the whole window.
+
+    The offset is checkpointed right after ``on_records`` returns, so
+    ``on_records`` must persist the records durably (e.g. OpportunitySink.write);
+    anything it only keeps in memory is lost if the run dies afterwards.
+    Pass ``keep_raw=True`` when the sink stores the full SAM payload.
+    """
+
+    def __init__(self, on_records: Callable[[List[OpportunityRecord]], None],
+                 store: JobStore = None, sam_client: SAMClient = None,
+                 job_name: str = 'opportunity-sync', page_size: int = 1000,
+                 naics_code: str = None, keep_raw: bool = False):
+        self.on_records = on_records
+        self.sam_client = sam_client or SAMClient()
+        self.page_size = page_size
+        self.naics_code = naics_code
+        self.keep_raw = keep_raw
+        self.runner = JobRunner(job_name, self.process_unit, store=store)
+
+    def plan(self, posted_from: datetime, posted_to: datetime, window_days: int = 7) -> int:
+        """Split [posted_from, posted_to] into window units; existing windows are skipped"""
+        return self.runner.plan(self._windows(posted_from, posted_to, window_days))
+
+    def _windows(self, posted_from: datetime, posted_to: datetime,
+                 window_days: int) -> Iterable[Tuple[str, Dict]]:
+        start = posted_from
+        while start <= posted_to:
+            end = min(start + timedelta(days=window_days - 1), posted_to)
+            key = f"{start.strftime('%Y-%m-%d')}_{end.strftime('%Y-%m-%d')}"
+            if self.naics_code:
+                key = f"{key}_{self.naics_code}"
+            yield key, {
+                'postedFrom': start.strftime('%m/%d/%Y'),
+                'postedTo': end.strftime('%m/%d/%Y'),
+            }
+            start = end + timedelta(days=1)
+
+    def process_unit(self, unit: WorkUnit) -> Dict:
+        offset = (unit.checkpoint or {}).get('offset', 0)
+        fetched = (unit.checkpoint or {}).get('fetched', 0)
+
+        while True:
+            time_left = unit.time_left()
+            if time_left is not None and time_left < MIN_PAGE_SECONDS:
+                unit.defer()
+
+            params = {
+                **unit.payload,
+                'limit': self.page_size,
+                'offset': offset,
+                'ptype': 'o',
+            }
+            if self.naics_code:
+                params['ncode'] = self.naics_code
+
+            timeout = SAM_REQUEST_TIMEOUT if time_left is None else min(SAM_REQUEST_TIMEOUT, time_left)
+            page = self.sam_client.search_opportunity_page(params, keep_raw=self.keep_raw, timeout=timeout)
+            if page is None:
+                remaining = unit.time_left()
+                if remaining is not None and remaining < MIN_PAGE_SECONDS:
+                    unit.defer()  # request was cut short by the budget, not a SAM failure
+                raise RuntimeError(f"SAM.gov search failed at offset {offset}")
+
+            records = page['records']
+            if records:
+                self.on_records(records)
+            fetched += len(records)
+            # Advance by the page requested, not by how many records decoded
+            offset += self.page_size
+            unit.save_checkpoint({'offset': offset, 'fetched': fetched})
+
+            total = page['total_records']
+            if (total is not None and offset >= total) or page['page_count'] < self.page_size:
+                return {'fetched': fetched}
+
+    def run(self, time_budget: float = None, workers: int = 1) -> Dict:
+        return self.runner.run(time_budget=time_budget, workers=workers)
+
+    def retry_failed(self) -> int:
+        """Give windows that ran out of attempts a fresh set; returns how many"""
+        return self.runner.store.reset_failed(self.runner.job_name)
+
+    def progress(self) -> Dict:
+        return self.runner.store.progress(self.runner.job_name)
+
+
+def sync_window(days_back: int, today: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Posted-date range for a sync covering the last ``days_back`` days"""
+    today = today or datetime.now()
+    return today - timedelta(days=days_back), today
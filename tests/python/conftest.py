@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Shared modules are imported the same way the api/python handlers do
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../lib/python')))
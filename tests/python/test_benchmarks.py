@@ -0,0 +1,23 @@
+from benchmarks.run import compare
+
+BASELINE = {'min_s': 1.0e-3, 'median_s': 1.2e-3, 'peak_bytes': 10_000}
+
+
+def result(min_s, median_s=None, peak_bytes=10_000):
+    return {'min_s': min_s, 'median_s': median_s or min_s, 'peak_bytes': peak_bytes}
+
+
+def test_noisy_median_is_not_a_regression():
+    # A busy machine drags the median well past 20%, but the fastest round is unchanged
+    assert compare(result(1.05e-3, median_s=2.0e-3), BASELINE, 0.2) == []
+    # Slower than the baseline min, still within threshold of its median
+    assert compare(result(1.4e-3), BASELINE, 0.2) == []
+
+
+def test_slower_fastest_round_is_flagged():
+    assert compare(result(1.5e-3), BASELINE, 0.2) == ['min_s +25% vs baseline median']
+
+
+def test_memory_growth_is_flagged():
+    assert compare(result(1.0e-3, peak_bytes=13_000), BASELINE, 0.2) == ['peak_bytes +30%']
+    assert compare(result(1.0e-3, peak_bytes=13_000), None, 0.2) == []
@@ -0,0 +1,168 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api.document_fetcher import DocumentFetcher
+
+
+class Upstream:
+    """Serves ``routes`` (path -> (body, headers)), answers If-None-Match with 304, else 404"""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                upstream.requests.append((self.path, self.headers.get('If-None-Match')))
+                if self.path not in upstream.routes:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body, headers = upstream.routes[self.path]
+                if headers.get('ETag') and self.headers.get('If-None-Match') == headers['ETag']:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def url(self, path: str) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+
+@pytest.fixture
+def upstream():
+    server = Upstream()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    return DocumentFetcher(store_dir=str(tmp_path), api_key='test-key', max_workers=2)
+
+
+def test_same_etag_on_another_url_is_still_downloaded(upstream, fetcher):
+    # nginx-style ETags are "mtime-size": equal for different files of the same size
+    upstream.routes['/a'] = (b'A' * 100, {'ETag': '"65f0a1b2-64"'})
+    upstream.routes['/b'] = (b'B' * 100, {'ETag': '"65f0a1b2-64"'})
+
+    a = fetcher.fetch(upstream.url('/a'))
+    b = fetcher.fetch(upstream.url('/b'))
+
+    assert b['status'] == 'downloaded'
+    assert b['sha256'] == hashlib.sha256(b'B' * 100).hexdigest() != a['sha256']
+    with open(fetcher.object_path(b['sha256']), 'rb') as f:
+        assert f.read() == b'B' * 100
+
+
+def test_sha256_digest_header_skips_download(upstream, fetcher):
+    body = b'%PDF-1.7 statement of work'
+    digest = base64.b64encode(hashlib.sha256(body).digest()).decode()
+    upstream.routes['/original.pdf'] = (body, {'Content-Type': 'application/pdf',
+                                              'x-amz-checksum-sha256': digest})
+    upstream.routes['/amendment.pdf'] = (body, {'Content-Type': 'application/pdf',
+                                               'Repr-Digest': f"sha-256=:{digest}:"})
+
+    # Nothing stored under that digest yet, so the body is downloaded and hashed
+    original = fetcher.fetch(upstream.url('/original.pdf'))
+    assert original['status'] == 'downloaded'
+
+    reposted = fetcher.fetch(upstream.url('/amendment.pdf'))
+    assert reposted['status'] == 'duplicate'
+    assert (reposted['sha256'], reposted['size']) == (original['sha256'], len(body))
+
+
+def test_conditional_refetch_returns_unchanged(upstream, fetcher):
+    upstream.routes['/sow.pdf'] = (b'%PDF-1.7 v1', {'Content-Type': 'application/pdf', 'ETag': '"v1"'})
+
+    first = fetcher.fetch(upstream.url('/sow.pdf'))
+    again = fetcher.fetch(upstream.url('/sow.pdf'))
+    assert (first['status'], first['changed']) == ('downloaded', True)
+    assert (again['status'], again['changed']) == ('unchanged', False)
+    assert again['sha256'] == first['sha256'] and again['content_type'] == 'application/pdf'
+    assert upstream.requests == [('/sow.pdf', None), ('/sow.pdf', '"v1"')]
+
+    upstream.routes['/sow.pdf'] = (b'%PDF-1.7 v2', {'Content-Type': 'application/pdf', 'ETag': '"v2"'})
+    updated = fetcher.fetch(upstream.url('/sow.pdf'))
+    assert (updated['status'], updated['changed']) == ('downloaded', True)
+    assert updated['sha256'] != first['sha256']
+
+
+def test_identical_bodies_are_stored_once(upstream, fetcher):
+    upstream.routes['/a.pdf'] = (b'same bytes', {})
+    upstream.routes['/b.pdf'] = (b'same bytes', {})
+
+    results = fetcher.fetch_opportunities([
+        {'noticeId': 'n1', 'resourceLinks': [upstream.url('/a.pdf')]},
+        {'noticeId': 'n2', 'resourceLinks': [upstream.url('/b.pdf')]},
+    ])
+
+    assert sorted(results) == ['n1', 'n2']
+    assert results['n1'][0]['sha256'] == results['n2'][0]['sha256']
+    objects = [name for _, _, names in os.walk(os.path.join(fetcher.store_dir, 'objects')) for name in names]
+    assert objects == [results['n1'][0]['sha256']]
+
+
+def test_http_error_is_reported(upstream, fetcher):
+    result = fetcher.fetch(upstream.url('/withdrawn.pdf'))
+    assert (result['status'], result['error']) == ('error', 'HTTP 404')
+    assert fetcher._manifest_row(upstream.url('/withdrawn.pdf')) is None
+
+
+def test_description_text_is_extracted_and_cached(upstream, fetcher):
+    description = {'description': '<p>Provide <b>janitorial</b> services.</p><ul><li>Daily</li></ul>'}
+    upstream.routes['/noticedesc'] = (json.dumps(description).encode(),
+                                      {'Content-Type': 'application/json'})
+
+    result = fetcher.fetch(upstream.url('/noticedesc'), 'n1', 'description')
+    text = fetcher.extract_text(result['sha256'], result['content_type'])
+    assert text == 'Provide janitorial services.\n\n- Daily'
+
+    # Served from the per-hash cache even once the object is gone
+    os.remove(fetcher.object_path(result['sha256']))
+    assert fetcher.extract_text(result['sha256'], result['content_type']) == text
+
+
+def test_untyped_documents_are_sniffed(upstream, fetcher):
+    upstream.routes['/attachment'] = (b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n1 0 obj', {})
+    upstream.routes['/notes'] = ('<p>Site visit – 10am</p>'.encode(), {})
+
+    pdf = fetcher.fetch(upstream.url('/attachment'))
+    notes = fetcher.fetch(upstream.url('/notes'))
+    assert pdf['content_type'] == '' and notes['content_type'] == ''
+
+    assert fetcher.extract_text(pdf['sha256'], pdf['content_type']) is None
+    assert not os.path.exists(f"{fetcher.store_dir}/text/{pdf['sha256']}.txt")
+    assert fetcher.extract_text(notes['sha256'], notes['content_type']) == 'Site visit – 10am'
+
+
+@pytest.mark.parametrize('url, authorized', [
+    ('https://sam.gov/api/prod/opps/v3/opportunities/resources/files/1/download', True),
+    ('https://api.sam.gov/prod/opportunities/v1/noticedesc?noticeid=1', True),
+    ('https://evilsam.gov/download', False),
+    ('https://sam.gov.example.com/download', False),
+])
+def test_api_key_only_sent_to_sam_gov(fetcher, url, authorized):
+    assert ('api_key=test-key' in fetcher._authorized(url)) is authorized
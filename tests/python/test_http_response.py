@@ -0,0 +1,215 @@
+import gzip
+import http.client
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import pytest
+
+from http_response import negotiate_encoding, send_json, stream_ndjson, zstandard
+from loadtest.harness import serve_endpoint
+from loadtest.stub_upstream import StubUpstream
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('', None),
+    ('gzip', 'gzip'),
+    ('gzip;q=0', None),
+    ('gzip;q=0, identity', None),
+    ('deflate, br', None),
+    ('*', 'zstd' if zstandard else 'gzip'),
+    ('*;q=0.5, zstd;q=0', 'gzip'),
+    ('gzip;q=1.0, zstd;q=0.4', 'gzip'),
+    ('GZIP;q=0.8, zstd;q=0.9', 'zstd' if zstandard else 'gzip'),
+    ('gzip;q=oops', None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    """/stream?n=..&fail_at=..&size=.. streams items; /json sends one JSON body"""
+
+    protocol_version = 'HTTP/1.1'
+    results = queue.Queue()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+        if url.path == '/json':
+            send_json(self, 200, {'items': [{'n': i} for i in range(int(params.get('n', 1)))]})
+            return
+
+        fail_at = int(params.get('fail_at', -1))
+        padding = 'x' * int(params.get('size', 0))
+
+        def items():
+            for i in range(int(params['n'])):
+                if i == fail_at:
+                    raise ValueError(f"cannot serialize item {i}")
+                yield {'n': i, 'padding': padding} if padding else {'n': i}
+
+        self.results.put(stream_ndjson(self, items(), trailer={'status': 'success'}, batch_size=10))
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StreamHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    StreamHandler.results = queue.Queue()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def raw_get(server, path: str, headers: dict = None) -> bytes:
+    """Whole response, unparsed, so chunk framing can be checked"""
+    host, port = server.server_address[:2]
+    with socket.create_connection((host, port), timeout=10) as sock:
+        lines = [f"GET {path} HTTP/1.1", f"Host: {host}", 'Connection: close']
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        sock.sendall(('\r\n'.join(lines) + '\r\n\r\n').encode())
+        response = b''
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return response
+            response += data
+
+
+def split_chunks(response: bytes):
+    head, _, body = response.partition(b'\r\n\r\n')
+    chunks = []
+    while True:
+        size_line, _, body = body.partition(b'\r\n')
+        size = int(size_line, 16)
+        if size == 0:
+            assert body == b'\r\n'
+            return head.decode(), chunks
+        chunks.append(body[:size])
+        assert body[size:size + 2] == b'\r\n'
+        body = body[size + 2:]
+
+
+def test_gzip_stream_is_flushed_per_batch(server):
+    head, chunks = split_chunks(raw_get(server, '/stream?n=35', {'Accept-Encoding': 'gzip'}))
+
+    assert 'Transfer-Encoding: chunked' in head and 'Content-Encoding: gzip' in head
+    assert 'Content-type: application/x-ndjson' in head
+    # One chunk per full batch of 10, then the remainder + trailer
+    assert len(chunks) == 4
+
+    # Each chunk decompresses to whole lines on its own, without the rest of the stream
+    decoder = zlib.decompressobj(31)
+    batches = [decoder.decompress(chunk).decode() for chunk in chunks]
+    assert all(batch.endswith('\n') for batch in batches)
+    lines = [json.loads(line) for line in ''.join(batches).splitlines()]
+    assert lines == [{'n': i} for i in range(35)] + [{'status': 'success'}]
+    assert decoder.eof and StreamHandler.results.get(timeout=5) is True
+
+
+@pytest.mark.skipif(zstandard is None, reason='zstandard not installed')
+def test_zstd_stream(server):
+    head, chunks = split_chunks(raw_get(server, '/stream?n=25', {'Accept-Encoding': 'zstd'}))
+
+    assert 'Content-Encoding: zstd' in head
+    body = zstandard.ZstdDecompressor().decompressobj().decompress(b''.join(chunks))
+    assert body.decode().splitlines()[-1] == '{"status":"success"}'
+
+
+def test_identity_stream_when_gzip_refused(server):
+    head, chunks = split_chunks(raw_get(server, '/stream?n=3', {'Accept-Encoding': 'gzip;q=0'}))
+
+    assert 'Content-Encoding' not in head
+    assert b''.join(chunks) == b'{"n":0}\n{"n":1}\n{"n":2}\n{"status":"success"}\n'
+
+
+def test_error_mid_stream_ends_body_with_error_line(server):
+    response = raw_get(server, '/stream?n=50&fail_at=23', {'Accept-Encoding': 'gzip'})
+    head, chunks = split_chunks(response)
+
+    # Exactly one status line: the error did not start a second response
+    assert response.count(b'HTTP/1.1 ') == 1 and head.startswith('HTTP/1.1 200')
+    lines = gzip.decompress(b''.join(chunks)).decode().splitlines()
+    assert [json.loads(line) for line in lines[:-1]] == [{'n': i} for i in range(23)]
+    assert json.loads(lines[-1]) == {'status': 'error', 'error': 'cannot serialize item 23'}
+    assert StreamHandler.results.get(timeout=5) is False
+
+
+def test_client_disconnect_stops_stream(server):
+    host, port = server.server_address[:2]
+    sock = socket.create_connection((host, port), timeout=10)
+    sock.sendall(f"GET /stream?n=100000&size=1000 HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    assert sock.recv(1024).startswith(b'HTTP/1.1 200')
+    # Reset the connection instead of a graceful close, like a client that went away
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+    sock.close()
+
+    assert StreamHandler.results.get(timeout=10) is False
+
+
+def test_send_json_compresses_large_bodies_only(server):
+    host, port = server.server_address[:2]
+    for n, encoding in ((1, None), (500, 'gzip')):
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        conn.request('GET', f"/json?n={n}", headers={'Accept-Encoding': 'gzip'})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+
+        assert response.getheader('Content-Encoding') == encoding
+        assert int(response.getheader('Content-Length')) == len(body)
+        payload = json.loads(gzip.decompress(body) if encoding else body)
+        assert payload == {'items': [{'n': i} for i in range(n)]}
+
+
+@pytest.fixture
+def fetch_endpoint(monkeypatch):
+    with StubUpstream() as stub:
+        stub.configure_clients()
+        monkeypatch.setenv('SAM_API_KEY', 'test')
+        endpoint = serve_endpoint('fetch_opportunities.py')
+        yield endpoint
+        endpoint.shutdown()
+        endpoint.server_close()
+    for name in ('SAM_API_BASE_URL', 'USASPENDING_BASE_URL'):
+        os.environ.pop(name, None)
+
+
+def post(server, payload: dict, headers: dict = None):
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    body = json.dumps(payload)
+    conn.request('POST', '/', body, {'Content-Type': 'application/json', **(headers or {})})
+    response = conn.getresponse()
+    data = response.read()
+    conn.close()
+    return response, data
+
+
+@pytest.mark.parametrize('stream', [True, False])
+def test_fetch_opportunities_fields_projection(fetch_endpoint, stream):
+    payload = {'min_deadline_days': 0, 'fields': 'title,notice_id', 'stream': stream}
+    response, body = post(fetch_endpoint, payload, {'Accept-Encoding': 'gzip'})
+
+    assert response.status == 200 and response.getheader('Content-Encoding') == 'gzip'
+    body = gzip.decompress(body).decode()
+    if stream:
+        *items, trailer = [json.loads(line) for line in body.splitlines()]
+        trailer = {**trailer, 'opportunities': items}
+    else:
+        trailer = json.loads(body)
+
+    assert trailer['status'] == 'success' and trailer['count'] == len(trailer['opportunities']) > 0
+    assert all(set(item) == {'title', 'notice_id'} for item in trailer['opportunities'])
@@ -0,0 +1,171 @@
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+from job_runner import JobRunner, JobStore, LeaseLostError, retry_delay
+from opportunity_record import OpportunityRecord
+from opportunity_sync import OpportunitySyncJob
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs.sqlite'))
+
+
+def test_plan_is_idempotent(store):
+    runner = JobRunner('job', lambda unit: None, store=store)
+    assert runner.plan([('a', {}), ('b', {})]) == 2
+    assert runner.plan([('a', {}), ('b', {}), ('c', {})]) == 1
+    assert store.progress('job')['total'] == 3
+
+
+def test_expired_lease_is_stolen(store):
+    store.add_units('job', [('a', {'n': 1})])
+    first = store.lease('job', 'worker-1', lease_seconds=60)
+    assert first.key == 'a'
+    assert store.lease('job', 'worker-2', lease_seconds=60) is None
+
+    store._connect().execute("UPDATE work_units SET lease_expires = 0")
+    stolen = store.lease('job', 'worker-2', lease_seconds=60)
+    assert stolen.key == 'a'
+
+    # The original holder can no longer checkpoint or complete the unit
+    with pytest.raises(LeaseLostError):
+        first.save_checkpoint({'offset': 10})
+    assert not store.complete('job', 'a', 'worker-1')
+    assert store.complete('job', 'a', 'worker-2')
+
+
+def test_resume_from_checkpoint(store):
+    store.add_units('job', [('a', {})])
+    seen = []
+
+    def crashing(unit):
+        unit.save_checkpoint({'step': 2})
+        raise KeyboardInterrupt  # invocation killed mid-unit
+
+    with pytest.raises(KeyboardInterrupt):
+        JobRunner('job', crashing, store=store).run()
+
+    store._connect().execute("UPDATE work_units SET lease_expires = 0")
+
+    def resuming(unit):
+        seen.append(unit.checkpoint)
+        return {'ok': True}
+
+    stats = JobRunner('job', resuming, store=store).run()
+    assert seen == [{'step': 2}]
+    assert stats['complete'] and stats['processed'] == 1
+
+
+def test_failed_units_keep_job_incomplete(store):
+    store.add_units('job', [('a', {})])
+
+    def failing(unit):
+        raise RuntimeError('boom')
+
+    stats = JobRunner('job', failing, store=store, max_attempts=2, retry_backoff=0).run()
+    assert stats['errors'] == 2 and stats['failed'] == 1
+    assert stats['complete'] is False
+
+    store.reset_failed('job')
+    assert JobRunner('job', lambda unit: None, store=store).run()['complete']
+
+
+def test_failed_unit_backs_off_until_a_later_run(store):
+    store.add_units('job', [('a', {}), ('b', {})])
+    calls = []
+
+    def rate_limited(unit):
+        calls.append(unit.key)
+        raise RuntimeError('SAM.gov search failed at offset 0')  # what a 429 surfaces as
+
+    stats = JobRunner('job', rate_limited, store=store).run(time_budget=30)
+    assert calls == ['a', 'b']
+    assert (stats['errors'], stats['pending'], stats['backing_off'], stats['failed']) == (2, 2, 2, 0)
+    assert JobRunner('job', rate_limited, store=store).run()['errors'] == 0
+
+    store._connect().execute("UPDATE work_units SET not_before = 0")
+    JobRunner('job', rate_limited, store=store).run(time_budget=30)
+    assert calls == ['a', 'b', 'a', 'b']
+    assert store._connect().execute("SELECT MIN(not_before) FROM work_units").fetchone()[0] > time.time() + 100
+
+
+def test_retry_delay_doubles_up_to_cap():
+    assert [retry_delay(attempts, 60) for attempts in (1, 2, 3)] == [60, 120, 240]
+    assert retry_delay(20, 60) == 3600
+
+
+def test_store_created_before_backoff_is_migrated(tmp_path):
+    path = str(tmp_path / 'old.sqlite')
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE work_units (
+            job_name TEXT NOT NULL, unit_key TEXT NOT NULL, payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending', checkpoint TEXT, result TEXT, error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0, lease_owner TEXT, lease_expires REAL,
+            updated_at TEXT NOT NULL, PRIMARY KEY (job_name, unit_key))
+    """)
+    conn.execute("INSERT INTO work_units (job_name, unit_key, payload, updated_at) VALUES ('job', 'a', '{}', '')")
+    conn.commit()
+    conn.close()
+
+    assert JobStore(path).lease('job', 'worker', 60).key == 'a'
+
+
+def test_lease_is_sized_to_time_budget(store):
+    store.add_units('job', [('a', {})])
+    expiries = []
+
+    def handler(unit):
+        expiries.append(store._connect().execute("SELECT lease_expires FROM work_units").fetchone()[0])
+
+    JobRunner('job', handler, store=store, lease_seconds=120).run(time_budget=10)
+    assert expiries[0] - time.time() < 20
+
+
+def test_unit_defers_when_budget_spent(store):
+    store.add_units('job', [('a', {})])
+
+    def handler(unit):
+        unit.save_checkpoint({'offset': 5})
+        unit.defer()
+
+    stats = JobRunner('job', handler, store=store).run(time_budget=30)
+    assert stats['deferred'] == 1
+    assert stats['pending'] == 1 and not stats['complete']
+    row = store._connect().execute("SELECT attempts, checkpoint FROM work_units").fetchone()
+    assert row == (0, '{"offset": 5}')
+
+
+class FakeSAMClient:
+    """Serves ``total`` opportunities, one of which has no noticeId"""
+
+    def __init__(self, total):
+        self.total = total
+        self.offsets = []
+
+    def search_opportunity_page(self, params, keep_raw=False, timeout=60):
+        self.offsets.append(params['offset'])
+        end = min(params['offset'] + params['limit'], self.total)
+        items = range(params['offset'], end)
+        return {
+            'records': [OpportunityRecord(solicitation_number=f"SOL-{i}") for i in items if i != 1],
+            'total_records': self.total,
+            'page_count': len(items),
+        }
+
+
+def test_sync_pages_by_requested_size(store):
+    written = []
+    client = FakeSAMClient(total=5)
+    job = OpportunitySyncJob(written.extend, store=store, sam_client=client, page_size=2)
+    job.plan(datetime(2026, 1, 1), datetime(2026, 1, 1), window_days=1)
+
+    stats = job.run()
+    assert stats['complete']
+    # An undecodable item on the first page must not shift or end the paging
+    assert client.offsets == [0, 2, 4]
+    assert len(written) == 4
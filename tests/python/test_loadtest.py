@@ -0,0 +1,18 @@
+import pytest
+
+from loadtest.harness import percentile
+
+
+@pytest.mark.parametrize('values, pct, expected', [
+    # round(2.5) == 2 under banker's rounding, which picked the 2nd of 5 as the median
+    ([1, 2, 3, 4, 5], 50, 3),
+    ([1, 2, 3, 4], 50, 2),
+    (list(range(1, 101)), 95, 95),
+    (list(range(1, 101)), 99, 99),
+    (list(range(1, 21)), 99, 20),
+    ([7], 50, 7),
+    ([1, 2, 3], 0, 1),
+    ([], 95, 0.0),
+])
+def test_nearest_rank_percentile(values, pct, expected):
+    assert percentile(values, pct) == expected
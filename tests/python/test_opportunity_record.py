@@ -0,0 +1,151 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from opportunity_record import OpportunityRecord, decode_search_page, parse_sam_date
+
+NOTICE_ID = 'f2a74de452e6b438'
+
+
+def sam_opportunity(**overrides):
+    opportunity = {
+        'noticeId': NOTICE_ID,
+        'title': 'Facilities Support Services',
+        'solicitationNumber': 'W912DY-26-R-0001',
+        'fullParentPathName': 'DEPT OF DEFENSE.DEPT OF THE ARMY.AMC',
+        'postedDate': '2026-09-13',
+        'type': 'Solicitation',
+        'typeOfSetAside': 'SBA',
+        'responseDeadLine': '2026-12-21T17:00:00-05:00',
+        'naicsCode': '561210',
+        'placeOfPerformance': {'state': {'code': 'VA', 'name': 'Virginia'}},
+        'description': f"https://api.sam.gov/prod/opportunities/v1/noticedesc?noticeid={NOTICE_ID}",
+        'uiLink': f"https://sam.gov/opp/{NOTICE_ID}/view",
+        'resourceLinks': ['https://sam.gov/api/prod/opps/v3/opportunities/resources/files/892f902b/download'],
+    }
+    opportunity.update(overrides)
+    return opportunity
+
+
+def test_projects_sam_fields():
+    record = OpportunityRecord.from_dict(sam_opportunity())
+
+    assert record.to_dict() == {
+        'solicitation_number': 'W912DY-26-R-0001',
+        'notice_id': NOTICE_ID,
+        'title': 'Facilities Support Services',
+        'naics_code': '561210',
+        'agency': 'DEPT OF DEFENSE.DEPT OF THE ARMY.AMC',
+        'department': 'DEPT OF DEFENSE',
+        'state': 'VA',
+        'notice_type': 'Solicitation',
+        'set_aside': 'SBA',
+        'posted_date': '2026-09-13T00:00:00',
+        'response_deadline': '2026-12-21T22:00:00',
+        'description_url': f"https://api.sam.gov/prod/opportunities/v1/noticedesc?noticeid={NOTICE_ID}",
+        'ui_link': f"https://sam.gov/opp/{NOTICE_ID}/view",
+        'resource_links': ['https://sam.gov/api/prod/opps/v3/opportunities/resources/files/892f902b/download'],
+    }
+    assert record.to_dict(['title', 'raw', 'state']) == {'title': 'Facilities Support Services', 'state': 'VA'}
+
+
+def test_earlier_alias_wins_regardless_of_key_order():
+    # Lower-precedence spellings first, so a "last one seen wins" decode would fail
+    data = {'solNumber': 'SOL-LOW', 'organizationName': 'ARMY', 'setAside': 'WOSB',
+            'solicitationNumber': 'SOL-HIGH', 'fullParentPathName': 'DEPT OF DEFENSE.ARMY',
+            'typeOfSetAside': 'SBA', 'noticeId': NOTICE_ID}
+    record = OpportunityRecord.from_dict(data)
+
+    assert (record.solicitation_number, record.agency, record.set_aside) == \
+        ('SOL-HIGH', 'DEPT OF DEFENSE.ARMY', 'SBA')
+
+
+def test_empty_values_fall_through_to_later_aliases():
+    record = OpportunityRecord.from_dict({'noticeId': NOTICE_ID, 'solicitationNumber': '',
+                                          'solNumber': 'SOL-1', 'naicsCode': None, 'naics': 561210})
+    assert (record.solicitation_number, record.naics_code) == ('SOL-1', '561210')
+
+
+@pytest.mark.parametrize('description, expected', [
+    ({'body': '<p>Full text</p>'}, '<p>Full text</p>'),
+    # Regression: a description object without a body used to block the fallback
+    ({'body': ''}, 'https://example.gov/more-info'),
+    ({}, 'https://example.gov/more-info'),
+    (None, 'https://example.gov/more-info'),
+])
+def test_description_falls_back_to_additional_info_link(description, expected):
+    data = sam_opportunity(description=description, additionalInfoLink='https://example.gov/more-info')
+    assert OpportunityRecord.from_dict(data).description_url == expected
+
+
+def test_derived_fields():
+    data = sam_opportunity(solicitationNumber=None, placeOfPerformance=None,
+                           officeAddress={'state': 'MD', 'city': 'Aberdeen'})
+    record = OpportunityRecord.from_dict(data)
+
+    assert record.solicitation_number == NOTICE_ID
+    assert record.state == 'MD'
+    assert record.department == 'DEPT OF DEFENSE'
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2026-12-21T17:00:00-05:00', datetime(2026, 12, 21, 22, 0)),
+    ('2026-12-21T22:00:00Z', datetime(2026, 12, 21, 22, 0)),
+    ('2026-09-13', datetime(2026, 9, 13)),
+    ('09/13/2026', datetime(2026, 9, 13)),
+    ('next Tuesday', None),
+    ('', None),
+    (None, None),
+    (20260913, None),
+])
+def test_parse_sam_date(value, expected):
+    assert parse_sam_date(value) == expected
+
+
+def test_keep_raw():
+    data = sam_opportunity(pointOfContact=[{'fullName': 'Jane Doe', 'email': 'jane.doe@army.mil'}])
+
+    assert OpportunityRecord.from_dict(data).raw is None
+    assert OpportunityRecord.from_dict(data).raw_json is None
+
+    record = OpportunityRecord.from_dict(data, keep_raw=True)
+    assert record.raw == data
+    assert record.raw_json == json.dumps(data, separators=(',', ':'))
+
+
+def test_links_not_in_sam_form_are_kept_verbatim():
+    links = ['https://sam.gov/api/prod/opps/v3/opportunities/resources/files/abc/download',
+             'https://example.gov/attachments/spec.pdf']
+    data = sam_opportunity(uiLink='https://sam.gov/opp/other-id/view', resourceLinks=links,
+                           description='https://example.gov/desc')
+    record = OpportunityRecord.from_dict(data)
+
+    assert record.ui_link == 'https://sam.gov/opp/other-id/view'
+    assert record.description_url == 'https://example.gov/desc'
+    assert record.resource_links == links
+    assert OpportunityRecord.from_dict(sam_opportunity(resourceLinks=None)).resource_links is None
+
+
+def test_repeated_values_are_shared_between_records():
+    first, second = (OpportunityRecord.from_dict(json.loads(json.dumps(sam_opportunity())))
+                     for _ in range(2))
+
+    assert first.agency is second.agency
+    assert first.set_aside is second.set_aside
+    assert first.response_deadline is second.response_deadline
+
+
+def test_decode_search_page():
+    body = json.dumps({
+        'totalRecords': 40,
+        'opportunitiesData': [sam_opportunity(), {'title': 'no notice id'}, sam_opportunity(noticeId='b2')],
+    })
+    page = decode_search_page(body.encode('utf-8'), keep_raw=True)
+
+    assert [record.notice_id for record in page['records']] == [NOTICE_ID, 'b2']
+    assert (page['total_records'], page['page_count']) == (40, 3)
+    # Nested objects (placeOfPerformance) stay plain dicts inside the raw payload
+    assert page['records'][0].raw == sam_opportunity()
+
+    assert decode_search_page('[]') == {'records': [], 'total_records': None, 'page_count': 0}
@@ -0,0 +1,104 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from opportunity_record import OpportunityRecord
+from opportunity_sink import OpportunitySink
+
+
+def sam_opportunity(number, title='Facilities Support', description=None):
+    return {
+        'noticeId': f"notice-{number}",
+        'solicitationNumber': f"SOL-{number}",
+        'title': title,
+        'description': description or f"https://api.sam.gov/prod/opportunities/v1/noticedesc?noticeid={number}",
+        'naicsCode': '561210',
+        'responseDeadLine': '2026-12-01T17:00:00-05:00',
+    }
+
+
+@pytest.fixture
+def database(tmp_path):
+    return str(tmp_path / 'opportunities.sqlite')
+
+
+def rows(database, *columns):
+    conn = sqlite3.connect(database)
+    try:
+        select = ', '.join(f'"{column}"' for column in columns)
+        return conn.execute(f'SELECT {select} FROM opportunities ORDER BY "solicitationNumber"').fetchall()
+    finally:
+        conn.close()
+
+
+def test_insert_then_update_counts(database):
+    with OpportunitySink(f"sqlite:///{database}", batch_size=2) as sink:
+        first = sink.write([sam_opportunity(i) for i in range(3)])
+        second = sink.write([sam_opportunity(i, title='Amended') for i in range(2, 5)])
+
+    assert (first['inserted'], first['updated'], first['batches']) == (3, 0, 2)
+    assert (second['inserted'], second['updated']) == (2, 1)
+    assert rows(database, 'solicitationNumber', 'title') == [
+        ('SOL-0', 'Facilities Support'), ('SOL-1', 'Facilities Support'),
+        ('SOL-2', 'Amended'), ('SOL-3', 'Amended'), ('SOL-4', 'Amended'),
+    ]
+
+
+def test_duplicates_and_unkeyed_rows_in_one_batch(database):
+    with OpportunitySink(f"sqlite:///{database}") as sink:
+        counts = sink.write([sam_opportunity(1), sam_opportunity(1, title='Latest'), {'title': 'No number'}])
+
+    assert (counts['received'], counts['skipped'], counts['inserted']) == (3, 1, 1)
+    assert rows(database, 'title') == [('Latest',)]
+
+
+def test_dry_run_rolls_back(database):
+    with OpportunitySink(f"sqlite:///{database}") as sink:
+        sink.write([sam_opportunity(1)])
+    with OpportunitySink(f"sqlite:///{database}", dry_run=True) as sink:
+        counts = sink.write([sam_opportunity(1, title='Changed'), sam_opportunity(2)])
+
+    assert counts['dry_run'] and (counts['inserted'], counts['updated']) == (1, 1)
+    assert rows(database, 'solicitationNumber', 'title') == [('SOL-1', 'Facilities Support')]
+
+
+def test_backfilled_description_survives_url(database):
+    with OpportunitySink(f"sqlite:///{database}") as sink:
+        sink.write([sam_opportunity(1, description='Full statement of work')])
+        sink.write([sam_opportunity(1)])
+
+    assert rows(database, 'description') == [('Full statement of work',)]
+
+
+def test_raw_data_kept(database):
+    without_raw = OpportunityRecord.from_dict(sam_opportunity(2))
+    with OpportunitySink(f"sqlite:///{database}") as sink:
+        sink.write([sam_opportunity(1), without_raw])
+        # A record decoded without raw doesn't wipe rawData that is already stored
+        sink.write([OpportunityRecord.from_dict(sam_opportunity(1))])
+
+    raw_1, raw_2 = [raw for (raw,) in rows(database, 'rawData')]
+    assert json.loads(raw_1) == sam_opportunity(1)
+    assert raw_2 is None
+
+
+def test_concurrent_sinks_share_a_file(database):
+    errors = []
+
+    def write(offset):
+        try:
+            with OpportunitySink(f"sqlite:///{database}", batch_size=10) as sink:
+                sink.write([sam_opportunity(offset + i) for i in range(100)])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n * 50,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(rows(database, 'id')) == 250